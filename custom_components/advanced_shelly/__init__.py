@@ -1,17 +1,29 @@
 """The Advanced Shelly integration."""
 from __future__ import annotations
 
+import asyncio
 import json
+from functools import partial
 import logging
+import secrets
 from datetime import datetime, timedelta
+from collections.abc import Iterator
 from pathlib import Path
 
+import aiohttp
 import voluptuous as vol
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.event import async_track_time_interval
-from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.config_entries import ConfigEntry, SOURCE_IMPORT
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.network import NoURLAvailableError, get_url
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
 from homeassistant.util import dt as dt_util
 
 from .const import (
@@ -21,36 +33,226 @@ from .const import (
     CONF_PASSWORD,
     CONF_BACKUP_PATH,
     CONF_BACKUP_INTERVAL,
+    CONF_CONNECTIVITY_INTERVAL,
+    CONF_STORAGE_BACKEND,
+    CONF_SCRIPT_STATUS_INTERVAL,
+    CONF_DEBUG_LOG,
+    CONF_DEBUG_LOG_ARCHIVE,
+    CONF_INVENTORY_PATH,
     DEFAULT_BACKUP_PATH,
     DEFAULT_BACKUP_INTERVAL,
+    DEFAULT_CONNECTIVITY_INTERVAL,
+    DEFAULT_STORAGE_BACKEND,
+    DEFAULT_SCRIPT_STATUS_INTERVAL,
+    STORAGE_BACKEND_GIT,
     SERVICE_BACKUP_NOW,
     SERVICE_RESTORE_SCRIPT,
     SERVICE_RESTORE_CONFIG,
+    SERVICE_IMPORT_INVENTORY,
+    SERVICE_RESTORE_DATA,
+    SERVICE_GET_DEBUG_LOG,
+    SERVICE_RESTORE_ALL,
+    SERVICE_SYNC_SCRIPTS,
+    SERVICE_CONFIGURE_OUTBOUND_WS,
     ATTR_DEVICE_ID,
     ATTR_SCRIPT_ID,
     ATTR_BACKUP_PATH,
+    ATTR_REVISION,
+    ATTR_INCLUDE,
+    ATTR_INVENTORY_PATH,
+    ATTR_CONCURRENCY,
+    ATTR_LINES,
+    ATTR_INCLUDE_CONFIG,
+    ATTR_RESTART,
+    ATTR_SOURCE_PATH,
+    ATTR_DELETE,
+    ATTR_VERIFY,
+    ATTR_ENABLE,
+    ATTR_URL,
+    DEBUG_LOG_DIR,
+    DEBUG_LOG_LINES,
+    DEFAULT_IMPORT_CONCURRENCY,
+    MAX_IMPORT_CONCURRENCY,
     PLATFORMS,
+    DATA_CONNECTIVITY_POLLER,
+    DATA_JOB_QUEUE,
+    DATA_RESTORE_JOB,
+    DATA_RESTORE_DEFERRED,
+    DATA_WS_TOKEN,
+    DATA_DEVICE_CACHE,
+    DEVICE_INFO_MAX_AGE,
+    WS_ENDPOINT,
+    WS_TOKEN_STORAGE_KEY,
+    RESTORE_CHECKPOINT_FILE,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_RECOVERY,
+    PRIORITY_MANUAL,
+    PRIORITY_SCHEDULED,
+    SERVICE_CANCEL_BACKUPS,
+    RESTORABLE_DATA,
+    DEVICE_CONFIG_FILE,
+    DEFAULT_TIMEOUT,
+    PROBE_TIMEOUT,
 )
+from .backup import (
+    DEVICE_DATA_FILES,
+    DEVICE_DATA_METHODS,
+    DEVICE_DATA_RESTORERS,
+    DeviceBackup,
+    config_hash,
+    find_script_backup,
+    list_live_scripts,
+    list_script_backups,
+    load_script_hashes,
+    read_script_metadata,
+    restore_script,
+)
+from .circuit_breaker import CircuitBreaker, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+from .connectivity import ConnectivityPoller
+from .debug_log import DebugLogBuffer, DebugLogStream
+from .device_cache import DeviceCache
+from .fleet import FleetManager
+from .config_flow import CannotConnect, InvalidAuth, UnsupportedDevice, validate_input
+from .git_storage import GitBackupStorage, GitStorageError, get_git_storage, git_available
+from .job_queue import JobCancelled, JobQueue
+from .inventory import InventoryError, load_inventory, normalize_row
+from .restore_checkpoint import (
+    ITEM_CONFIG,
+    STATUS_FAILED,
+    STATUS_RESTORED,
+    STATUS_UNCHANGED,
+    RestoreCheckpoint,
+    script_item,
+)
+from .script_sync import load_script_sources, sync_scripts
 from .shelly_client import ShellyClient
+from .ws_rpc import RpcError, WsRpcConnection
+from .ws_server import ShellyOutboundView
 
 _LOGGER = logging.getLogger(__name__)
 
 SIGNAL_UPDATE_SHELLY = "shelly_backup_update_{}"
+SIGNAL_SCRIPT_STATUS = "shelly_backup_script_status_{}"
+SIGNAL_NEW_SCRIPTS = "shelly_backup_new_scripts_{}"
+SIGNAL_DEVICE_IDENTIFIED = "shelly_backup_device_identified"
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Set up the Advanced Shelly integration.
+
+    Services are registered here so the inventory import is available
+    before any device has been configured.
+    """
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][DATA_CONNECTIVITY_POLLER] = ConnectivityPoller(hass)
+    job_queue = JobQueue(create_task=hass.async_create_background_task)
+    hass.data[DOMAIN][DATA_JOB_QUEUE] = job_queue
+    device_cache = DeviceCache(hass)
+    await device_cache.async_load()
+    hass.data[DOMAIN][DATA_DEVICE_CACHE] = device_cache
+    await async_setup_services(hass)
+
+    # Devices with an outbound WebSocket connect to a URL holding this token
+    store = Store(hass, 1, WS_TOKEN_STORAGE_KEY)
+    ws_data = await store.async_load() or {}
+    if "token" not in ws_data:
+        ws_data = {"token": secrets.token_urlsafe(24)}
+        await store.async_save(ws_data)
+    hass.data[DOMAIN][DATA_WS_TOKEN] = ws_data["token"]
+    hass.http.register_view(
+        ShellyOutboundView(ws_data["token"], partial(async_find_coordinator, hass))
+    )
+
+    @callback
+    def resume_restore(hass: HomeAssistant) -> None:
+        """Continue a restore_all job that was interrupted by a restart."""
+        hass.async_create_background_task(
+            async_resume_restore(hass), f"{DOMAIN} resume restore_all"
+        )
+
+    async_at_started(hass, resume_restore)
+
+    async def shutdown_job_queue(event: Event) -> None:
+        """Cancel queued and running device jobs when Home Assistant stops."""
+        await job_queue.async_shutdown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, shutdown_job_queue)
+    return True
+
+
+@callback
+def async_get_coordinators(hass: HomeAssistant) -> Iterator[ShellyBackupCoordinator]:
+    """Yield the coordinator of every device, from single device and fleet entries."""
+    for value in hass.data.get(DOMAIN, {}).values():
+        if isinstance(value, ShellyBackupCoordinator):
+            yield value
+        elif isinstance(value, FleetManager):
+            yield from value.coordinators
+
+
+@callback
+def async_find_coordinator(hass: HomeAssistant, device_id: str) -> ShellyBackupCoordinator | None:
+    """Return the coordinator of a device ID, or None if no entry manages it."""
+    for coordinator in async_get_coordinators(hass):
+        if coordinator.device_id == device_id:
+            return coordinator
+    return None
+
+
+async def _async_get_storage(hass: HomeAssistant, entry: ConfigEntry, backup_path: str) -> GitBackupStorage | None:
+    """Create the backup directory and return its git storage, if that backend is selected."""
+    storage_backend = entry.data.get(CONF_STORAGE_BACKEND, DEFAULT_STORAGE_BACKEND)
+
+    # Create backup directory if it doesn't exist
+    await hass.async_add_executor_job(partial(Path(backup_path).mkdir, parents=True, exist_ok=True))
+
+    if storage_backend != STORAGE_BACKEND_GIT:
+        return None
+    if not await hass.async_add_executor_job(git_available):
+        _LOGGER.warning("git executable not found, storing backups as plain files")
+        return None
+
+    storage = get_git_storage(backup_path)
+    await hass.async_add_executor_job(storage.ensure_repo)
+    return storage
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Shelly Scripts Backup from a config entry."""
+    if CONF_INVENTORY_PATH in entry.data:
+        return await async_setup_fleet_entry(hass, entry)
+
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
     password = entry.data.get(CONF_PASSWORD)
     backup_path = entry.data.get(CONF_BACKUP_PATH, DEFAULT_BACKUP_PATH)
     backup_interval = entry.data.get(CONF_BACKUP_INTERVAL, DEFAULT_BACKUP_INTERVAL)
+    connectivity_interval = entry.data.get(
+        CONF_CONNECTIVITY_INTERVAL, DEFAULT_CONNECTIVITY_INTERVAL
+    )
+    script_status_interval = entry.data.get(
+        CONF_SCRIPT_STATUS_INTERVAL, DEFAULT_SCRIPT_STATUS_INTERVAL
+    )
 
-    # Create backup directory if it doesn't exist
-    Path(backup_path).mkdir(parents=True, exist_ok=True)
+    storage = await _async_get_storage(hass, entry, backup_path)
 
     # Initialize the coordinator
-    coordinator = ShellyBackupCoordinator(hass, host, port, password, backup_path)
+    coordinator = ShellyBackupCoordinator(
+        hass,
+        host,
+        port,
+        password,
+        backup_path,
+        connectivity_interval,
+        storage,
+        hass.data[DOMAIN][DATA_JOB_QUEUE],
+        entry_id=entry.entry_id,
+        device_cache=hass.data[DOMAIN][DATA_DEVICE_CACHE],
+    )
+    # Known before the device answers, so its outbound WebSocket binds right away
+    seeded = coordinator.async_seed_identity(entry.unique_id)
 
     # Test connection
     try:
@@ -61,12 +263,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    if seeded:
+        coordinator.async_announce_identified()
 
     # Schedule periodic backups
     async def periodic_backup(now):
         """Perform periodic backup."""
         try:
             await coordinator.backup_scripts()
+        except JobCancelled:
+            _LOGGER.info(f"Periodic backup of {coordinator.device_id} was cancelled")
         except Exception as err:  # noqa: BLE001 - never let the timer task die
             _LOGGER.error(f"Periodic backup failed: {err}")
 
@@ -75,11 +281,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
     hass.data[DOMAIN][f"{entry.entry_id}_cancel"] = cancel_interval
 
-    # Perform initial backup
-    await periodic_backup(None)
+    # Perform initial backup through the job queue without holding up setup
+    entry.async_create_background_task(
+        hass, periodic_backup(None), f"{DOMAIN} initial backup {entry.entry_id}"
+    )
 
-    # Register services
-    await async_setup_services(hass)
+    # Keep connectivity fresh between backups
+    hass.data[DOMAIN][DATA_CONNECTIVITY_POLLER].async_add(coordinator)
+
+    # Read script runtime status before the platforms create script entities;
+    # an offline device would only hold up setup for another timeout
+    if coordinator.is_available:
+        try:
+            await coordinator.async_refresh_script_status()
+        except Exception as err:  # noqa: BLE001 - sensors fill in on the next refresh
+            _LOGGER.warning(f"Failed to read script status: {err}")
+    coordinator.async_start_script_status(script_status_interval)
+
+    # Collect script debug output
+    if entry.data.get(CONF_DEBUG_LOG, False):
+        coordinator.async_start_debug_log(entry.data.get(CONF_DEBUG_LOG_ARCHIVE, False))
 
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -90,6 +311,88 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def async_setup_fleet_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up a fleet entry managing every device of an inventory file.
+
+    Devices are not contacted during setup: the connectivity poller and the
+    initial backup sweep identify them in the background, and entities are
+    added per device once that happened.
+    """
+    backup_path = entry.data.get(CONF_BACKUP_PATH, DEFAULT_BACKUP_PATH)
+    connectivity_interval = entry.data.get(
+        CONF_CONNECTIVITY_INTERVAL, DEFAULT_CONNECTIVITY_INTERVAL
+    )
+
+    try:
+        raw_rows = await hass.async_add_executor_job(load_inventory, entry.data[CONF_INVENTORY_PATH])
+    except InventoryError as err:
+        raise ConfigEntryNotReady(str(err)) from err
+
+    storage = await _async_get_storage(hass, entry, backup_path)
+    job_queue = hass.data[DOMAIN][DATA_JOB_QUEUE]
+    device_cache = hass.data[DOMAIN][DATA_DEVICE_CACHE]
+
+    coordinators = {}
+    for index, raw_row in enumerate(raw_rows, start=1):
+        try:
+            row = normalize_row(raw_row)
+        except ValueError as err:
+            _LOGGER.warning(f"Skipping inventory row {index}: {err}")
+            continue
+
+        coordinator = ShellyBackupCoordinator(
+            hass,
+            row[CONF_HOST],
+            row[CONF_PORT],
+            row.get(CONF_PASSWORD),
+            backup_path,
+            connectivity_interval,
+            storage,
+            job_queue,
+            entry_id=entry.entry_id,
+            fleet=True,
+            device_cache=device_cache,
+        )
+        if coordinator.device_key in coordinators:
+            _LOGGER.warning(f"Skipping inventory row {index}: duplicate of {coordinator.device_key}")
+            continue
+        coordinators[coordinator.device_key] = coordinator
+
+    fleet = FleetManager(
+        hass,
+        entry.entry_id,
+        list(coordinators.values()),
+        entry.data.get(CONF_DEBUG_LOG, False),
+        entry.data.get(CONF_DEBUG_LOG_ARCHIVE, False),
+    )
+    hass.data[DOMAIN][entry.entry_id] = fleet
+    _LOGGER.info(f"Fleet {entry.title} manages {len(fleet.coordinators)} devices")
+
+    # Platforms subscribe to new devices before any device can be identified
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Devices known from a previous run are identified without waiting for
+    # them to answer, so their outbound WebSockets bind right away
+    for coordinator in fleet.coordinators:
+        if coordinator.async_seed_identity():
+            coordinator.async_announce_identified()
+
+    poller = hass.data[DOMAIN][DATA_CONNECTIVITY_POLLER]
+    for coordinator in fleet.coordinators:
+        poller.async_add(coordinator)
+
+    fleet.async_start(
+        entry.data.get(CONF_BACKUP_INTERVAL, DEFAULT_BACKUP_INTERVAL),
+        entry.data.get(CONF_SCRIPT_STATUS_INTERVAL, DEFAULT_SCRIPT_STATUS_INTERVAL),
+    )
+    entry.async_create_background_task(
+        hass, fleet.async_backup_all(), f"{DOMAIN} initial fleet backup {entry.entry_id}"
+    )
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    return True
+
+
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     # Simply reload the entry, which will restart with new settings
@@ -107,7 +410,15 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         cancel_interval()
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        managed = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinators = managed.coordinators if isinstance(managed, FleetManager) else [managed]
+        for coordinator in coordinators:
+            hass.data[DOMAIN][DATA_CONNECTIVITY_POLLER].async_remove(coordinator)
+            hass.data[DOMAIN][DATA_JOB_QUEUE].cancel(
+                coordinator.device_key, min_priority=PRIORITY_INTERACTIVE
+            )
+        # A fleet also cancels its shared timers
+        managed.async_shutdown()
 
     return unload_ok
 
@@ -121,44 +432,135 @@ async def async_setup_services(hass: HomeAssistant) -> None:
 
         if device_id:
             # Backup specific device
-            for entry_id, coordinator in hass.data[DOMAIN].items():
-                if isinstance(coordinator, ShellyBackupCoordinator):
-                    if coordinator.device_id == device_id:
-                        await coordinator.backup_scripts()
-                        return
-            _LOGGER.error("Device with ID %s not found", device_id)
+            coordinator = async_find_coordinator(hass, device_id)
+            if coordinator is None:
+                _LOGGER.error("Device with ID %s not found", device_id)
+                return
+            try:
+                await coordinator.backup_scripts(PRIORITY_MANUAL)
+            except JobCancelled:
+                _LOGGER.info(f"Backup of {device_id} was cancelled")
         else:
-            # Backup all devices
-            for entry_id, coordinator in hass.data[DOMAIN].items():
-                if isinstance(coordinator, ShellyBackupCoordinator):
-                    await coordinator.backup_scripts()
+            # Backup all devices, the job queue bounds how many run at once
+            coordinators = list(async_get_coordinators(hass))
+            results = await asyncio.gather(
+                *(coordinator.backup_scripts(PRIORITY_MANUAL) for coordinator in coordinators),
+                return_exceptions=True,
+            )
+            cancelled = 0
+            for coordinator, result in zip(coordinators, results):
+                if isinstance(result, JobCancelled):
+                    cancelled += 1
+                elif isinstance(result, Exception):
+                    _LOGGER.error(f"Backup of {coordinator.device_id or coordinator.host} failed: {result}")
+            if cancelled:
+                _LOGGER.info(f"{cancelled} backups were cancelled")
+
+    async def handle_cancel_backups(call: ServiceCall) -> None:
+        """Handle cancellation of queued backups."""
+        device_key = None
+        device_id = call.data.get(ATTR_DEVICE_ID)
+        if device_id:
+            coordinator = async_find_coordinator(hass, device_id)
+            if coordinator is None:
+                _LOGGER.error(f"Device with ID {device_id} not found")
+                return
+            device_key = coordinator.device_key
+
+        hass.data[DOMAIN][DATA_JOB_QUEUE].cancel(device_key)
 
     async def handle_restore_script(call: ServiceCall) -> None:
         """Handle script restoration service call."""
         device_id = call.data[ATTR_DEVICE_ID]
         script_id = call.data[ATTR_SCRIPT_ID]
         backup_path = call.data.get(ATTR_BACKUP_PATH)
+        revision = call.data.get(ATTR_REVISION)
 
-        for entry_id, coordinator in hass.data[DOMAIN].items():
-            if isinstance(coordinator, ShellyBackupCoordinator):
-                if coordinator.device_id == device_id:
-                    await coordinator.restore_script(script_id, backup_path)
-                    return
-
-        _LOGGER.error(f"Device with ID {device_id} not found")
+        coordinator = async_find_coordinator(hass, device_id)
+        if coordinator is None:
+            _LOGGER.error(f"Device with ID {device_id} not found")
+            return
+        await coordinator.restore_script(script_id, backup_path, revision)
 
     async def handle_restore_config(call: ServiceCall) -> None:
         """Handle configuration restoration service call."""
         device_id = call.data[ATTR_DEVICE_ID]
         backup_path = call.data.get(ATTR_BACKUP_PATH)
+        revision = call.data.get(ATTR_REVISION)
 
-        for entry_id, coordinator in hass.data[DOMAIN].items():
-            if isinstance(coordinator, ShellyBackupCoordinator):
-                if coordinator.device_id == device_id:
-                    await coordinator.restore_config(backup_path)
-                    return
+        coordinator = async_find_coordinator(hass, device_id)
+        if coordinator is None:
+            _LOGGER.error(f"Device with ID {device_id} not found")
+            return
+        await coordinator.restore_config(backup_path, revision)
+
+    async def handle_restore_data(call: ServiceCall) -> None:
+        """Handle KVS, schedules and webhooks restoration service call."""
+        device_id = call.data[ATTR_DEVICE_ID]
+        include = call.data[ATTR_INCLUDE]
+        revision = call.data.get(ATTR_REVISION)
+
+        coordinator = async_find_coordinator(hass, device_id)
+        if coordinator is None:
+            _LOGGER.error(f"Device with ID {device_id} not found")
+            return
+        await coordinator.restore_data(include, revision)
+
+    async def handle_get_debug_log(call: ServiceCall) -> ServiceResponse:
+        """Return the buffered debug log lines of a device."""
+        device_id = call.data[ATTR_DEVICE_ID]
+
+        coordinator = async_find_coordinator(hass, device_id)
+        if coordinator is None:
+            raise HomeAssistantError(f"Device with ID {device_id} not found")
+        if coordinator.debug_log is None:
+            raise HomeAssistantError(f"Debug log is not enabled for {device_id}")
+        return {
+            "device_id": device_id,
+            "connected": coordinator.debug_log.connected,
+            "lines": coordinator.debug_log.buffer.lines(call.data.get(ATTR_LINES)),
+        }
+
+    async def handle_restore_all(call: ServiceCall) -> ServiceResponse:
+        """Handle fleet-wide restore, resuming an interrupted one."""
+        return await async_restore_all(
+            hass,
+            call.data.get(ATTR_DEVICE_ID),
+            call.data.get(ATTR_REVISION),
+            call.data[ATTR_INCLUDE_CONFIG],
+            call.data[ATTR_RESTART],
+        )
+
+    async def handle_sync_scripts(call: ServiceCall) -> ServiceResponse:
+        """Handle deployment of a local script directory to devices."""
+        return await async_sync_scripts(
+            hass,
+            call.data[ATTR_SOURCE_PATH],
+            call.data.get(ATTR_DEVICE_ID),
+            call.data[ATTR_DELETE],
+            call.data[ATTR_VERIFY],
+        )
+
+    async def handle_configure_outbound_ws(call: ServiceCall) -> ServiceResponse:
+        """Handle pointing device outbound WebSockets at Home Assistant."""
+        return await async_configure_outbound_ws(
+            hass,
+            call.data.get(ATTR_DEVICE_ID),
+            call.data[ATTR_ENABLE],
+            call.data.get(ATTR_URL),
+        )
 
-        _LOGGER.error(f"Device with ID {device_id} not found")
+    async def handle_import_inventory(call: ServiceCall) -> ServiceResponse:
+        """Handle bulk import of devices from an inventory file."""
+        try:
+            results = await async_import_inventory(
+                hass,
+                call.data[ATTR_INVENTORY_PATH],
+                call.data[ATTR_CONCURRENCY],
+            )
+        except (InventoryError, OSError) as err:
+            raise HomeAssistantError(f"Cannot read inventory: {err}") from err
+        return {"results": results}
 
     # Register services only once
     if not hass.services.has_service(DOMAIN, SERVICE_BACKUP_NOW):
@@ -171,6 +573,16 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             }),
         )
 
+    if not hass.services.has_service(DOMAIN, SERVICE_CANCEL_BACKUPS):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_CANCEL_BACKUPS,
+            handle_cancel_backups,
+            schema=vol.Schema({
+                vol.Optional(ATTR_DEVICE_ID): str,
+            }),
+        )
+
     if not hass.services.has_service(DOMAIN, SERVICE_RESTORE_SCRIPT):
         hass.services.async_register(
             DOMAIN,
@@ -179,7 +591,8 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             schema=vol.Schema({
                 vol.Required(ATTR_DEVICE_ID): str,
                 vol.Required(ATTR_SCRIPT_ID): vol.Coerce(int),
-                vol.Optional(ATTR_BACKUP_PATH): str,
+                vol.Exclusive(ATTR_BACKUP_PATH, "source"): str,
+                vol.Exclusive(ATTR_REVISION, "source"): str,
             }),
         )
 
@@ -190,28 +603,467 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             handle_restore_config,
             schema=vol.Schema({
                 vol.Required(ATTR_DEVICE_ID): str,
-                vol.Optional(ATTR_BACKUP_PATH): str,
+                vol.Exclusive(ATTR_BACKUP_PATH, "source"): str,
+                vol.Exclusive(ATTR_REVISION, "source"): str,
+            }),
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_RESTORE_DATA):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_RESTORE_DATA,
+            handle_restore_data,
+            schema=vol.Schema({
+                vol.Required(ATTR_DEVICE_ID): str,
+                vol.Optional(ATTR_INCLUDE, default=RESTORABLE_DATA): vol.All(
+                    cv.ensure_list, [vol.In(RESTORABLE_DATA)]
+                ),
+                vol.Optional(ATTR_REVISION): str,
+            }),
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_GET_DEBUG_LOG):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_GET_DEBUG_LOG,
+            handle_get_debug_log,
+            schema=vol.Schema({
+                vol.Required(ATTR_DEVICE_ID): str,
+                vol.Optional(ATTR_LINES): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=DEBUG_LOG_LINES)
+                ),
+            }),
+            supports_response=SupportsResponse.ONLY,
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_RESTORE_ALL):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_RESTORE_ALL,
+            handle_restore_all,
+            schema=vol.Schema({
+                vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [str]),
+                vol.Optional(ATTR_REVISION): str,
+                vol.Optional(ATTR_INCLUDE_CONFIG, default=True): cv.boolean,
+                vol.Optional(ATTR_RESTART, default=False): cv.boolean,
+            }),
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_SYNC_SCRIPTS):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_SYNC_SCRIPTS,
+            handle_sync_scripts,
+            schema=vol.Schema({
+                vol.Required(ATTR_SOURCE_PATH): str,
+                vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [str]),
+                vol.Optional(ATTR_DELETE, default=False): cv.boolean,
+                vol.Optional(ATTR_VERIFY, default=False): cv.boolean,
+            }),
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_CONFIGURE_OUTBOUND_WS):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_CONFIGURE_OUTBOUND_WS,
+            handle_configure_outbound_ws,
+            schema=vol.Schema({
+                vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [str]),
+                vol.Optional(ATTR_ENABLE, default=True): cv.boolean,
+                vol.Optional(ATTR_URL): str,
+            }),
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
+    if not hass.services.has_service(DOMAIN, SERVICE_IMPORT_INVENTORY):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_IMPORT_INVENTORY,
+            handle_import_inventory,
+            schema=vol.Schema({
+                vol.Required(ATTR_INVENTORY_PATH): str,
+                vol.Optional(ATTR_CONCURRENCY, default=DEFAULT_IMPORT_CONCURRENCY): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=MAX_IMPORT_CONCURRENCY)
+                ),
             }),
+            supports_response=SupportsResponse.OPTIONAL,
         )
 
 
+async def async_restore_all(
+        hass: HomeAssistant,
+        device_ids: list[str] | None = None,
+        revision: str | None = None,
+        include_config: bool = True,
+        restart: bool = False,
+) -> dict:
+    """Restore the scripts (and configuration) of many devices with a checkpoint.
+
+    An unfinished checkpoint is resumed with its original devices and
+    options unless `restart` is set. Devices that are not loaded or fail
+    stay pending for the next run. Returns the item outcomes per device.
+    """
+    if DATA_RESTORE_JOB in hass.data[DOMAIN]:
+        raise HomeAssistantError("A restore_all job is already running")
+
+    path = hass.config.path(RESTORE_CHECKPOINT_FILE)
+    checkpoint = None if restart else await hass.async_add_executor_job(RestoreCheckpoint.load, path)
+    if checkpoint is not None and not checkpoint.finished:
+        _LOGGER.info(f"Resuming restore_all job started {checkpoint.data['started']}")
+    else:
+        if device_ids is None:
+            device_ids = [
+                coordinator.device_id
+                for coordinator in async_get_coordinators(hass)
+                if coordinator.device_id
+            ]
+        else:
+            # Known devices that are not identified yet are waited for; an
+            # unknown ID would keep the job from ever finishing
+            known = {coordinator.device_id for coordinator in async_get_coordinators(hass)}
+            known.update(entry.unique_id for entry in hass.config_entries.async_entries(DOMAIN))
+            for device_id in device_ids:
+                if device_id not in known:
+                    raise HomeAssistantError(f"Device with ID {device_id} not found")
+        checkpoint = RestoreCheckpoint.create(path, device_ids, revision, include_config)
+
+    save_lock = asyncio.Lock()
+
+    async def save() -> None:
+        # Serialize on the event loop, where the checkpoint is modified
+        content = checkpoint.dumps()
+        async with save_lock:
+            await hass.async_add_executor_job(checkpoint.write, content)
+
+    unidentified: list[str] = []
+
+    async def restore_device(device_id: str) -> None:
+        coordinator = async_find_coordinator(hass, device_id)
+        if coordinator is None:
+            _LOGGER.warning(f"Device {device_id} is not identified yet, restoring it once it is")
+            unidentified.append(device_id)
+            return
+        try:
+            await coordinator.restore_from_checkpoint(checkpoint, save)
+        except Exception as err:  # noqa: BLE001 - the other devices continue
+            _LOGGER.error(f"Restore of {device_id} failed: {err}")
+
+    hass.data[DOMAIN][DATA_RESTORE_JOB] = checkpoint
+    try:
+        await save()
+        await asyncio.gather(*(
+            restore_device(device_id)
+            for device_id in checkpoint.device_ids
+            if not checkpoint.is_device_complete(device_id)
+        ))
+        await save()
+    finally:
+        hass.data[DOMAIN].pop(DATA_RESTORE_JOB, None)
+
+    if unidentified:
+        _async_defer_restore(hass, unidentified)
+    if checkpoint.finished:
+        _LOGGER.info("restore_all job finished")
+    else:
+        _LOGGER.warning("restore_all job stopped with pending devices, call it again to resume")
+    return {"finished": checkpoint.finished, "devices": checkpoint.summary()}
+
+
+async def async_resume_restore(hass: HomeAssistant) -> None:
+    """Continue an unfinished restore_all job, if there is one."""
+    checkpoint = await hass.async_add_executor_job(
+        RestoreCheckpoint.load, hass.config.path(RESTORE_CHECKPOINT_FILE)
+    )
+    if checkpoint is None or checkpoint.finished:
+        return
+    try:
+        await async_restore_all(hass)
+    except HomeAssistantError as err:
+        _LOGGER.warning(f"Could not resume restore_all: {err}")
+
+
+@callback
+def _async_defer_restore(hass: HomeAssistant, device_ids: list[str]) -> None:
+    """Resume the restore_all job once one of its unidentified devices is identified."""
+    if (unsub := hass.data[DOMAIN].pop(DATA_RESTORE_DEFERRED, None)) is not None:
+        unsub()
+
+    @callback
+    def resume() -> None:
+        if (unsub := hass.data[DOMAIN].pop(DATA_RESTORE_DEFERRED, None)) is not None:
+            unsub()
+        hass.async_create_background_task(
+            async_resume_restore(hass), f"{DOMAIN} resume restore_all"
+        )
+
+    if any(async_find_coordinator(hass, device_id) for device_id in device_ids):
+        # Identified while the job was running
+        resume()
+        return
+
+    @callback
+    def device_identified(coordinator: ShellyBackupCoordinator) -> None:
+        if coordinator.device_id in device_ids:
+            resume()
+
+    hass.data[DOMAIN][DATA_RESTORE_DEFERRED] = async_dispatcher_connect(
+        hass, SIGNAL_DEVICE_IDENTIFIED, device_identified
+    )
+
+
+async def async_sync_scripts(
+        hass: HomeAssistant,
+        source_path: str,
+        device_ids: list[str] | None = None,
+        delete: bool = False,
+        verify: bool = False,
+) -> dict:
+    """Deploy the `.js` files of a directory to many devices, changing only what differs."""
+    try:
+        sources = await hass.async_add_executor_job(load_script_sources, source_path)
+    except OSError as err:
+        raise HomeAssistantError(f"Cannot read scripts from {source_path}: {err}") from err
+    if not sources and delete:
+        # An empty or mistyped directory must not wipe every script
+        raise HomeAssistantError(f"No .js files found in {source_path}")
+
+    if device_ids is None:
+        coordinators = [c for c in async_get_coordinators(hass) if c.device_id]
+    else:
+        coordinators = []
+        for device_id in device_ids:
+            coordinator = async_find_coordinator(hass, device_id)
+            if coordinator is None:
+                raise HomeAssistantError(f"Device with ID {device_id} not found")
+            coordinators.append(coordinator)
+
+    async def sync_device(coordinator: ShellyBackupCoordinator) -> dict:
+        try:
+            return await coordinator.sync_scripts(sources, delete, verify)
+        except Exception as err:  # noqa: BLE001 - reported per device
+            _LOGGER.error(f"Script sync of {coordinator.device_id} failed: {err}")
+            return {"error": str(err)}
+
+    reports = await asyncio.gather(*(sync_device(coordinator) for coordinator in coordinators))
+    return {
+        "devices": {
+            coordinator.device_id: report
+            for coordinator, report in zip(coordinators, reports)
+        }
+    }
+
+
+async def async_configure_outbound_ws(
+        hass: HomeAssistant,
+        device_ids: list[str] | None = None,
+        enable: bool = True,
+        base_url: str | None = None,
+) -> dict:
+    """Configure the outbound WebSocket of devices to connect to this instance.
+
+    `base_url` defaults to the internal URL of Home Assistant. The devices
+    apply the setting after their next reboot.
+    """
+    if base_url is None:
+        try:
+            base_url = get_url(hass, allow_external=False)
+        except NoURLAvailableError as err:
+            raise HomeAssistantError("No internal URL configured, pass a url") from err
+    path = WS_ENDPOINT.format(token=hass.data[DOMAIN][DATA_WS_TOKEN])
+    server = base_url.rstrip("/").replace("https://", "wss://", 1).replace("http://", "ws://", 1) + path
+
+    if device_ids is None:
+        coordinators = [c for c in async_get_coordinators(hass) if c.device_id]
+    else:
+        coordinators = []
+        for device_id in device_ids:
+            coordinator = async_find_coordinator(hass, device_id)
+            if coordinator is None:
+                raise HomeAssistantError(f"Device with ID {device_id} not found")
+            coordinators.append(coordinator)
+
+    async def configure(coordinator: ShellyBackupCoordinator) -> dict:
+        try:
+            return await coordinator.configure_outbound_ws(server, enable)
+        except Exception as err:  # noqa: BLE001 - reported per device
+            _LOGGER.error(f"Outbound WebSocket setup of {coordinator.device_id} failed: {err}")
+            return {"error": str(err)}
+
+    results = await asyncio.gather(*(configure(coordinator) for coordinator in coordinators))
+    return {
+        "devices": {
+            coordinator.device_id: result
+            for coordinator, result in zip(coordinators, results)
+        }
+    }
+
+
+async def async_import_inventory(
+        hass: HomeAssistant,
+        inventory_path: str,
+        concurrency: int = DEFAULT_IMPORT_CONCURRENCY,
+) -> list[dict]:
+    """Validate every device of an inventory in parallel and create or update entries.
+
+    Returns one report row per inventory row, in file order. Rows that resolve
+    to an already seen device ID are reported as duplicates and skipped.
+    """
+    rows = await hass.async_add_executor_job(load_inventory, inventory_path)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def validate_row(index: int, row: dict) -> tuple[dict, dict | None, dict | None]:
+        report = {"row": index, "host": row.get(CONF_HOST)}
+        try:
+            data = normalize_row(row)
+        except ValueError as err:
+            return {**report, "status": "invalid", "error": str(err)}, None, None
+
+        async with semaphore:
+            try:
+                info = await validate_input(hass, data)
+            except CannotConnect as err:
+                return {**report, "status": "cannot_connect", "error": str(err)}, None, None
+            except InvalidAuth as err:
+                return {**report, "status": "invalid_auth", "error": str(err)}, None, None
+            except UnsupportedDevice as err:
+                return {**report, "status": "unsupported_device", "error": str(err)}, None, None
+            except Exception as err:  # noqa: BLE001 - one bad row must not fail the batch
+                _LOGGER.exception(f"Unexpected error validating {data[CONF_HOST]}")
+                return {**report, "status": "unknown", "error": str(err)}, None, None
+
+        return {**report, "device_id": info["device_id"]}, data, info
+
+    validated = await asyncio.gather(
+        *(validate_row(index, row) for index, row in enumerate(rows, start=1))
+    )
+
+    entries_by_device = {
+        entry.unique_id: entry for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+    seen: dict[str, int] = {}
+
+    async def apply_row(report: dict, data: dict, info: dict) -> None:
+        entry = entries_by_device.get(info["device_id"])
+        if entry is not None:
+            # Settings the row leaves out keep their current value instead of
+            # the defaults; host and port are where the device was just reached
+            row = rows[report["row"] - 1]
+            updates = {
+                key: value for key, value in data.items()
+                if key in (CONF_HOST, CONF_PORT) or key in row
+            }
+            new_data = {**entry.data, **updates}
+            if new_data == dict(entry.data):
+                report["status"] = "unchanged"
+            else:
+                # The update listener reloads the entry with the new settings
+                hass.config_entries.async_update_entry(entry, data=new_data)
+                report["status"] = "updated"
+            return
+
+        async with semaphore:
+            result = await hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={"source": SOURCE_IMPORT},
+                data={"title": info["title"], "device_id": info["device_id"], "data": data},
+            )
+        if result["type"] == FlowResultType.CREATE_ENTRY:
+            report["status"] = "created"
+        else:
+            report["status"] = result.get("reason", "aborted")
+
+    pending = []
+    for report, data, info in validated:
+        if info is None:
+            continue
+        device_id = info["device_id"]
+        if device_id in seen:
+            report["status"] = "duplicate"
+            report["error"] = f"Same device as row {seen[device_id]}"
+            continue
+        seen[device_id] = report["row"]
+        pending.append(apply_row(report, data, info))
+
+    await asyncio.gather(*pending)
+
+    results = [report for report, _, _ in validated]
+    summary: dict[str, int] = {}
+    for report in results:
+        summary[report["status"]] = summary.get(report["status"], 0) + 1
+    _LOGGER.info(f"Inventory import from {inventory_path} finished: {summary}")
+    return results
+
+
+def _parse_script_status(status: dict, previous: dict[int, dict] | None = None) -> dict[int, dict]:
+    """Return the script status held by `script:N` entries of a status response.
+
+    Entries missing from `status` are kept from `previous`, and so are
+    fields a partial status notification leaves out.
+    """
+    script_status = dict(previous or {})
+    for key, value in status.items():
+        if not key.startswith("script:") or not isinstance(value, dict):
+            continue
+        script_id = int(key.split(":", 1)[1])
+        known = script_status.get(script_id, {})
+        script_status[script_id] = {
+            "running": value.get("running", known.get("running", False)),
+            "mem_used": value.get("mem_used", known.get("mem_used")),
+            "mem_peak": value.get("mem_peak", known.get("mem_peak")),
+            "mem_free": value.get("mem_free", known.get("mem_free")),
+            "errors": value.get("errors", known.get("errors", [])),
+        }
+    return script_status
+
+
 class ShellyBackupCoordinator:
     """Class to manage Shelly script backups."""
 
+    # Fleets hold hundreds of these, keep them compact
+    __slots__ = (
+        "hass", "host", "port", "password", "backup_path", "connectivity_interval",
+        "storage", "job_queue", "entry_id", "fleet", "on_identified",
+        "device_id", "device_name", "last_backup_time", "last_seen", "is_available",
+        "backup_count", "script_count", "last_error", "breaker", "_cancel_probe",
+        "_pooled_client", "script_status", "script_names", "_cancel_script_status",
+        "debug_log", "debug_log_archive", "rpc", "device_cache",
+    )
+
     def __init__(
             self,
             hass: HomeAssistant,
             host: str,
             port: int,
             password: str | None,
-            backup_path: str
+            backup_path: str,
+            connectivity_interval: int = DEFAULT_CONNECTIVITY_INTERVAL,
+            storage: GitBackupStorage | None = None,
+            job_queue: JobQueue | None = None,
+            entry_id: str | None = None,
+            fleet: bool = False,
+            device_cache: DeviceCache | None = None,
     ) -> None:
-        """Initialize the coordinator."""
+        """Initialize the coordinator.
+
+        Fleet devices run all RPC calls over Home Assistant's shared
+        connection pool and identify their entities by device ID.
+        """
         self.hass = hass
         self.host = host
         self.port = port
         self.password = password
         self.backup_path = backup_path
+        self.connectivity_interval = connectivity_interval
+        # Optional git history of the backup directory
+        self.storage = storage
+        # Operations run through the shared queue when one is given
+        self.job_queue = job_queue
+        self.entry_id = entry_id
+        self.fleet = fleet
+        # Called once when the device ID becomes known
+        self.on_identified = None
 
         # State tracking
         self.device_id: str | None = None
@@ -223,6 +1075,187 @@ class ShellyBackupCoordinator:
         self.script_count: int = 0
         self.last_error: str | None = None
 
+        # Fail fast while the device keeps failing
+        self.breaker = CircuitBreaker()
+        self._cancel_probe = None
+
+        # Long-lived client on the shared connection pool for frequent light
+        # calls, so digest auth state survives between them
+        self._pooled_client: ShellyClient | None = None
+
+        # Script runtime status from Shelly.GetStatus, keyed by script ID
+        self.script_status: dict[int, dict] = {}
+        self.script_names: dict[int, str] = {}
+        self._cancel_script_status = None
+
+        # Device debug log stream, when enabled
+        self.debug_log: DebugLogStream | None = None
+        self.debug_log_archive = False
+
+        # Outbound WebSocket of the device while it is connected
+        self.rpc: WsRpcConnection | None = None
+
+        # Persisted device info and supported methods, shared by all devices
+        self.device_cache = device_cache
+
+    @property
+    def device_key(self) -> str:
+        """Return the key that serializes operations on this device."""
+        return f"{self.host}:{self.port}"
+
+    @property
+    def unique_prefix(self) -> str:
+        """Return the prefix of entity unique IDs and the device registry identifier."""
+        return self.device_id if self.fleet else self.entry_id
+
+    def _open_client(self) -> ShellyClient:
+        """Return a client for an operation, to be used with `async with`.
+
+        Fleet devices and devices connected over their outbound WebSocket
+        borrow the pooled client, whose context does not close the session.
+        """
+        if self.fleet or self.rpc is not None:
+            return self._get_pooled_client()
+        return ShellyClient(self.host, self.port, self.password)
+
+    async def _run_job(self, priority: int, factory, description: str):
+        """Run an operation through the job queue, or directly without one."""
+        if self.job_queue is None:
+            return await factory()
+        return await self.job_queue.run(
+            self.device_key,
+            priority,
+            factory,
+            f"{description} of {self.device_id or self.host}",
+        )
+
+    def async_shutdown(self) -> None:
+        """Cancel pending probes and timers."""
+        self._cancel_pending_probe()
+        if self._cancel_script_status:
+            self._cancel_script_status()
+            self._cancel_script_status = None
+        if self.debug_log is not None:
+            self.debug_log.stop()
+            self.debug_log = None
+
+    @callback
+    def async_attach_rpc(self, connection: WsRpcConnection) -> None:
+        """Run RPC calls over the device's outbound WebSocket from now on."""
+        if self.rpc is not None:
+            self.rpc.close()
+        self.rpc = connection
+        _LOGGER.info(f"Device {self.device_id} connected over its outbound WebSocket")
+        self._cancel_pending_probe()
+        self.breaker.record_success()
+        self.last_seen = dt_util.utcnow()
+        self.is_available = True
+        self.last_error = None
+        self._update_entities()
+
+    @callback
+    def async_detach_rpc(self, connection: WsRpcConnection) -> None:
+        """Fall back to HTTP polling after the outbound WebSocket closed."""
+        if self.rpc is not connection:
+            # Already replaced by a newer connection
+            return
+        self.rpc = None
+        _LOGGER.info(f"Outbound WebSocket of {self.device_id} closed")
+        self.is_available = False
+        self.last_error = "Outbound WebSocket closed"
+        self._update_entities()
+
+    @callback
+    def async_handle_notification(self, data: dict) -> None:
+        """Apply a status notification pushed by the device."""
+        self.last_seen = dt_util.utcnow()
+        method = data.get("method")
+        params = data.get("params")
+        if method not in ("NotifyStatus", "NotifyFullStatus") or not isinstance(params, dict):
+            return
+
+        # A full status lists every script, partial ones only what changed
+        previous = None if method == "NotifyFullStatus" else self.script_status
+        script_status = _parse_script_status(params, previous)
+        if script_status == self.script_status:
+            return
+        # Not awaited here: new scripts need a Script.List answered on this connection
+        self.hass.async_create_background_task(
+            self._async_push_script_status(script_status),
+            f"{DOMAIN} script status {self.device_id}",
+        )
+
+    async def _async_push_script_status(self, script_status: dict[int, dict]) -> None:
+        """Apply pushed script status, never letting the task fail."""
+        try:
+            await self._async_apply_script_status(self._get_pooled_client(), script_status)
+        except Exception as err:  # noqa: BLE001 - the next notification retries
+            _LOGGER.debug(f"Script status update for {self.device_id} failed: {err}")
+
+    async def configure_outbound_ws(self, server: str, enable: bool = True) -> dict:
+        """Point the device's outbound WebSocket at `server`, ahead of queued backups."""
+        return await self._run_job(
+            PRIORITY_RECOVERY,
+            partial(self._configure_outbound_ws, server, enable),
+            "Outbound WebSocket setup",
+        )
+
+    async def _configure_outbound_ws(self, server: str, enable: bool) -> dict:
+        """Write the outbound WebSocket configuration of the device."""
+        config = {"enable": enable}
+        if enable:
+            config["server"] = server
+        async with self._open_client() as client:
+            result = await client.ws_set_config(config)
+        if enable:
+            # The path holds the token, keep it out of the log
+            _LOGGER.info(f"Outbound WebSocket of {self.device_id} set to {server.split('/api/', 1)[0]}")
+        else:
+            _LOGGER.info(f"Outbound WebSocket of {self.device_id} disabled")
+        return {"restart_required": result.get("restart_required", False)}
+
+    def async_start_debug_log(self, archive: bool = False) -> None:
+        """Start reading the device debug log over the shared session.
+
+        The archive is kept per device ID; for a device that was not
+        identified yet it starts once the ID is known.
+        """
+        self.debug_log_archive = archive
+        self.debug_log = DebugLogStream(
+            async_get_clientsession(self.hass),
+            self.host,
+            self.port,
+            DebugLogBuffer(archive_dir=self._debug_log_archive_dir()),
+            self.password,
+            self.hass.async_create_background_task,
+        )
+        self.debug_log.start()
+
+    def _debug_log_archive_dir(self) -> Path | None:
+        """Return the debug log archive directory, or None while there is none."""
+        if not self.debug_log_archive or self.device_id is None:
+            return None
+        return Path(self.hass.config.path(DEBUG_LOG_DIR, self.device_id))
+
+    def _cancel_pending_probe(self) -> None:
+        """Cancel any pending half-open probe."""
+        if self._cancel_probe:
+            self._cancel_probe()
+            self._cancel_probe = None
+
+    def _get_pooled_client(self) -> ShellyClient:
+        """Return the client bound to the device's outbound WebSocket or the shared pool."""
+        if self.rpc is not None:
+            return ShellyClient(self.host, self.port, self.password, rpc=self.rpc)
+        if self._pooled_client is None:
+            self._pooled_client = ShellyClient(
+                self.host,
+                self.port,
+                self.password,
+                session=async_get_clientsession(self.hass),
+            )
+        return self._pooled_client
+
     def _update_entities(self) -> None:
         """Trigger entity state updates via dispatcher."""
         if self.device_id:
@@ -236,14 +1269,32 @@ class ShellyBackupCoordinator:
 
         Reuses `client` when given so a backup run does not open a second
         session (and a second digest handshake) just to read the device info.
+        Returns False without touching the network while the circuit is open.
         """
+        if not self.breaker.allow_request():
+            _LOGGER.debug(
+                f"Circuit open for {self.host}, next probe in {self.breaker.retry_in:.0f}s"
+            )
+            self.is_available = False
+            return False
+
+        probing = self.breaker.state == STATE_HALF_OPEN
         try:
-            if client is not None:
+            if client is not None and not probing:
                 await self._read_device_info(client)
+            elif self.fleet or self.rpc is not None:
+                await self._read_device_info(
+                    self._get_pooled_client(), timeout=PROBE_TIMEOUT if probing else None
+                )
             else:
-                async with ShellyClient(self.host, self.port, self.password) as own_client:
+                # Half-open probes use a short timeout so a dead device is cheap
+                timeout = PROBE_TIMEOUT if probing else DEFAULT_TIMEOUT
+                async with ShellyClient(
+                        self.host, self.port, self.password, timeout=timeout
+                ) as own_client:
                     await self._read_device_info(own_client)
 
+            self.breaker.record_success()
             # Update entity states
             self._update_entities()
             return True
@@ -251,86 +1302,231 @@ class ShellyBackupCoordinator:
             _LOGGER.warning(f"Failed to update device status: {err}")
             self.is_available = False
             self.last_error = str(err)
+            self._record_failure()
 
             # Update entity states
             self._update_entities()
             return False
 
-    async def _read_device_info(self, client: ShellyClient) -> None:
+    def _record_success(self) -> None:
+        """Record a successful request, publishing a closed circuit."""
+        previous_state = self.breaker.state
+        self.breaker.record_success()
+        if previous_state != STATE_CLOSED:
+            self._update_entities()
+
+    def _record_failure(self) -> None:
+        """Count a connection failure and schedule a probe if the circuit opened."""
+        previous_state = self.breaker.state
+        self.breaker.record_failure()
+        if self.breaker.state != previous_state:
+            # Opened or reopened with a longer delay, even if already offline
+            self._update_entities()
+        if self.breaker.state != STATE_OPEN:
+            return
+
+        _LOGGER.info(
+            f"Circuit opened for {self.host} after {self.breaker.failures} failures, "
+            f"probing again in {self.breaker.retry_in:.0f}s"
+        )
+        self._cancel_pending_probe()
+        self._cancel_probe = async_call_later(
+            self.hass, self.breaker.retry_in, self._async_probe
+        )
+
+    async def _async_probe(self, _now) -> None:
+        """Run a scheduled half-open probe."""
+        self._cancel_probe = None
+        await self.update_device_status()
+
+    async def async_check_connectivity(self) -> None:
+        """Run a cheap liveness probe, publishing only on state transitions."""
+        if self.rpc is not None:
+            # The open connection and its heartbeat tell the device is alive
+            return
+        if not self.breaker.allow_request():
+            return
+
+        was_available = self.is_available
+        try:
+            await self._read_device_info(self._get_pooled_client(), timeout=PROBE_TIMEOUT)
+            self._record_success()
+        except Exception as err:  # noqa: BLE001 - any failure means offline
+            _LOGGER.debug(f"Connectivity probe for {self.host} failed: {err}")
+            self.is_available = False
+            self.last_error = str(err)
+            self._record_failure()
+
+        if self.is_available != was_available:
+            _LOGGER.info(
+                f"Device {self.device_id or self.host} is now "
+                f"{'online' if self.is_available else 'offline'}"
+            )
+            self._update_entities()
+
+    def async_start_script_status(self, interval: int) -> None:
+        """Refresh script runtime status every `interval` seconds."""
+        self._cancel_script_status = async_track_time_interval(
+            self.hass, self._async_script_status_tick, timedelta(seconds=interval)
+        )
+
+    async def _async_script_status_tick(self, _now) -> None:
+        """Refresh script status from the timer, never letting it fail."""
+        try:
+            await self.async_refresh_script_status()
+        except Exception as err:  # noqa: BLE001 - never let the timer task die
+            _LOGGER.debug(f"Script status refresh for {self.host} failed: {err}")
+
+    async def async_refresh_script_status(self) -> None:
+        """Read all scripts' runtime status with one Shelly.GetStatus call.
+
+        Every `script:N` entry of the status response holds the running state,
+        memory usage and errors of one script. Entities are only notified when
+        something changed.
+        """
+        if not self.device_id or not self.breaker.allow_request():
+            return
+        if self.rpc is not None:
+            # The device pushes status changes over its connection
+            return
+
+        client = self._get_pooled_client()
+        try:
+            status = await client.get_status()
+        except Exception:
+            self._record_failure()
+            raise
+        self._record_success()
+
+        await self._async_apply_script_status(client, _parse_script_status(status))
+
+    async def _async_apply_script_status(
+            self, client: ShellyClient, script_status: dict[int, dict]
+    ) -> None:
+        """Store new script status and notify entities if something changed."""
+        new_scripts = set(script_status) - set(self.script_status)
+        if new_scripts - set(self.script_names):
+            # Status entries carry no names, fetch them once for new scripts
+            scripts = (await client.get_script_list()).get("scripts", [])
+            self.script_names.update(
+                {script["id"]: script.get("name", f"script_{script['id']}") for script in scripts}
+            )
+
+        if script_status == self.script_status:
+            return
+
+        self.script_status = script_status
+        if new_scripts:
+            async_dispatcher_send(self.hass, SIGNAL_NEW_SCRIPTS.format(self.device_id))
+        async_dispatcher_send(self.hass, SIGNAL_SCRIPT_STATUS.format(self.device_id))
+
+    async def _read_device_info(self, client: ShellyClient, timeout: float | None = None) -> None:
         """Read device info and mark the device as available."""
-        device_info = await client.get_device_info()
+        device_info = await client.get_device_info(timeout=timeout)
+        identified = self.device_id is None
         self.device_id = device_info.get("id", "unknown")
         self.device_name = device_info.get("name", "unknown")
         self.last_seen = dt_util.utcnow()
         self.is_available = True
         self.last_error = None
+        if self.device_cache is not None:
+            self.device_cache.update_info(self.device_key, device_info)
+        if identified:
+            self.async_announce_identified()
+
+    @callback
+    def async_seed_identity(self, device_id: str | None = None) -> bool:
+        """Take the device ID known from a previous run, before the device answered.
+
+        Falls back to the cached device info when no ID is given. Returns
+        True if the ID was set; the caller announces it once the device
+        can be found.
+        """
+        cached = self.device_cache.get(self.device_key) if self.device_cache is not None else None
+        info = cached["info"] if cached is not None else {}
+        device_id = device_id or info.get("id")
+        if self.device_id is not None or not device_id:
+            return False
+        self.device_id = device_id
+        if info.get("id") == device_id:
+            self.device_name = info.get("name")
+        return True
+
+    @callback
+    def async_announce_identified(self) -> None:
+        """Announce that the device ID became known and the device can be found by it."""
+        if self.debug_log is not None:
+            self.debug_log.buffer.archive_dir = self._debug_log_archive_dir()
+        if self.on_identified is not None:
+            self.on_identified(self)
+        async_dispatcher_send(self.hass, SIGNAL_DEVICE_IDENTIFIED, self)
+
+    async def async_ensure_available(self, client: ShellyClient | None = None) -> bool:
+        """Return True if the device can be used for an operation.
+
+        Skips the device info call when a probe, operation or pushed
+        notification saw the device less than `DEVICE_INFO_MAX_AGE` ago.
+        """
+        if (
+                self.is_available
+                and self.breaker.state == STATE_CLOSED
+                and self.last_seen is not None
+                and (dt_util.utcnow() - self.last_seen).total_seconds() < DEVICE_INFO_MAX_AGE
+        ):
+            return True
+        return await self.update_device_status(client)
+
+    async def _async_supported_methods(self, client: ShellyClient) -> set[str] | None:
+        """Return the RPC methods of the device, from the cache or Shelly.ListMethods.
 
-    async def backup_scripts(self) -> None:
+        Returns None when they cannot be told, so callers try every method.
+        """
+        if self.device_cache is None:
+            return None
+        methods = self.device_cache.methods(self.device_key, self.device_id)
+        if methods is not None:
+            return methods
+
+        try:
+            methods = (await client.list_methods()).get("methods", [])
+        except Exception as err:  # noqa: BLE001 - fall back to trying every method
+            _LOGGER.debug(f"Listing methods of {self.device_id} failed: {err}")
+            return None
+        self.device_cache.set_methods(self.device_key, methods)
+        return set(methods)
+
+    async def backup_scripts(self, priority: int = PRIORITY_SCHEDULED) -> None:
+        """Queue a backup of the device and wait for it to finish."""
+        await self._run_job(priority, self._backup_scripts, "Backup")
+
+    async def _backup_scripts(self) -> None:
         """Backup all scripts from the device."""
         try:
-            async with ShellyClient(self.host, self.port, self.password) as client:
-                # Update device status first
-                if not await self.update_device_status(client):
+            async with self._open_client() as client:
+                # Update device status first, unless it was seen just now
+                if not await self.async_ensure_available(client):
                     _LOGGER.error("Device is offline, skipping backup")
                     return
 
                 _LOGGER.info(f"Starting backup for device {self.device_name} ({self.device_id})")
 
-                # Create device-specific backup directory
-                device_backup_path = Path(self.backup_path) / self.device_id
-                device_backup_path.mkdir(parents=True, exist_ok=True)
-
-                # Backup device configuration
-                await self._backup_config(client, device_backup_path, self.device_id, self.device_name)
-
-                # Backup scripts
-                scripts_response = await client.get_script_list()
-                scripts = scripts_response.get("scripts", [])
+                device_backup = DeviceBackup(
+                    client,
+                    self.backup_path,
+                    self.device_id,
+                    self.device_name,
+                    # The git history records when each backup ran
+                    with_timestamps=self.storage is None,
+                    methods=await self._async_supported_methods(client),
+                )
+                scripts = await device_backup.run()
                 self.script_count = len(scripts)
+                self.script_names.update(
+                    {script["id"]: script.get("name", f"script_{script['id']}") for script in scripts}
+                )
 
-                # Get active script IDs
-                active_script_ids = {str(script.get("id")) for script in scripts}
-
-                # Clean up old script backups
-                self._cleanup_old_backups(device_backup_path, active_script_ids)
-
-                if not scripts:
-                    _LOGGER.info(f"No scripts found on device {self.device_id}")
-                else:
-                    # Backup each script
-                    backed_up_count = 0
-                    for script in scripts:
-                        script_id = script.get("id")
-                        script_name = script.get("name", f"script_{script_id}")
-
-                        _LOGGER.debug(f"Backing up script {script_name} (ID: {script_id})")
-
-                        try:
-                            code_response = await client.get_script_code(script_id)
-                            code = code_response.get("data", "")
-
-                            # Save script code
-                            script_file = device_backup_path / f"{script_id}_{script_name}.js"
-                            with open(script_file, "w", encoding="utf-8") as f:
-                                f.write(code)
-
-                            # Save script metadata
-                            metadata = {
-                                "id": script_id,
-                                "name": script_name,
-                                "enable": script.get("enable", False),
-                                "device_id": self.device_id,
-                                "device_name": self.device_name,
-                            }
-
-                            metadata_file = device_backup_path / f"{script_id}_{script_name}.json"
-                            with open(metadata_file, "w", encoding="utf-8") as f:
-                                json.dump(metadata, f, indent=2)
-
-                            _LOGGER.info(f"Backed up script {script_name} (ID: {script_id})")
-                            backed_up_count += 1
-                        except Exception as err:
-                            _LOGGER.error(f"Error backing up script {script_name}: {err}")
+            if self.storage is not None:
+                await self._commit_backup()
 
             # Update backup metrics (use timezone-aware datetime)
             self.last_backup_time = dt_util.utcnow()
@@ -345,98 +1541,89 @@ class ShellyBackupCoordinator:
         except Exception as err:
             _LOGGER.error(f"Error during backup: {err}")
             self.last_error = str(err)
+            if isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError)):
+                self.is_available = False
+                self._record_failure()
             self._update_entities()
             raise
 
-    def _cleanup_old_backups(self, backup_path: Path, active_script_ids: set[str]) -> None:
-        """Remove backup files for scripts that no longer exist on the device."""
-        if not backup_path.exists():
+    async def _commit_backup(self) -> None:
+        """Record the device backup as one commit in the git history."""
+        message = f"Backup {self.device_name} ({self.device_id}): {self.script_count} scripts"
+        try:
+            revision = await self.hass.async_add_executor_job(
+                self.storage.commit, self.device_id, message
+            )
+        except Exception as err:  # noqa: BLE001 - files are on disk even if the commit fails
+            _LOGGER.error(f"Error committing backup to git history: {err}")
             return
 
-        deleted_count = 0
-        for file_path in backup_path.iterdir():
-            if not file_path.is_file():
-                continue
-
-            # Skip device config files
-            if file_path.name.startswith("device_config"):
-                continue
-
-            # Extract script ID from filename (format: {script_id}_{script_name}.{ext})
-            filename = file_path.stem  # Without extension
-            try:
-                # Script ID is the first part before underscore
-                script_id = filename.split("_", 1)[0]
-
-                # If script ID is not in active scripts, delete the file
-                if script_id not in active_script_ids:
-                    _LOGGER.info(f"Deleting old backup file: {file_path.name}")
-                    file_path.unlink()
-                    deleted_count += 1
-            except (IndexError, ValueError) as err:
-                _LOGGER.warning(f"Could not parse script ID from filename {file_path.name}: {err}")
-
-        if deleted_count > 0:
-            _LOGGER.info(f"Cleaned up {deleted_count} old backup files")
+        if revision:
+            _LOGGER.info(f"Committed backup of {self.device_id} as {revision[:12]}")
+        else:
+            _LOGGER.debug(f"Backup of {self.device_id} unchanged, nothing to commit")
 
-    async def _backup_config(
+    async def restore_script(
             self,
-            client: ShellyClient,
-            device_backup_path: Path,
-            device_id: str,
-            device_name: str
+            script_id: int,
+            backup_path: str | None = None,
+            revision: str | None = None,
     ) -> None:
-        """Backup device configuration."""
-        try:
-            _LOGGER.debug(f"Backing up configuration for device {device_id}")
-
-            config = await client.get_config()
-
-            # Save full configuration
-            config_file = device_backup_path / "device_config.json"
-            config_data = {
-                "device_id": device_id,
-                "device_name": device_name,
-                "config": config,
-                "backup_time": dt_util.utcnow().isoformat(),
-            }
-
-            with open(config_file, "w", encoding="utf-8") as f:
-                json.dump(config_data, f, indent=2)
-
-            _LOGGER.info(f"Backed up configuration for device {device_id}")
-
-        except Exception as err:
-            _LOGGER.error(f"Error backing up configuration: {err}")
-            # Don't raise - continue with script backup even if config backup fails
+        """Restore a script ahead of any queued background work."""
+        await self._run_job(
+            PRIORITY_INTERACTIVE,
+            partial(self._restore_script, script_id, backup_path, revision),
+            f"Restore of script {script_id}",
+        )
 
-    async def restore_script(self, script_id: int, backup_path: str | None = None) -> None:
-        """Restore a script from backup."""
+    async def _restore_script(
+            self,
+            script_id: int,
+            backup_path: str | None = None,
+            revision: str | None = None,
+    ) -> None:
+        """Restore a script from backup, optionally from a git revision."""
         try:
-            if not await self.update_device_status():
+            if not await self.async_ensure_available():
                 _LOGGER.error("Device is offline, cannot restore script")
                 return
 
-            if backup_path:
-                script_file = Path(backup_path)
-            else:
-                # Find the script in the default backup location
-                device_backup_path = Path(self.backup_path) / self.device_id
-                script_files = list(device_backup_path.glob(f"{script_id}_*.js"))
+            if revision:
+                if self.storage is None:
+                    _LOGGER.error("Restoring a revision requires the git storage backend")
+                    return
 
-                if not script_files:
-                    _LOGGER.error(f"No backup found for script ID {script_id}")
+                script_file = await self.hass.async_add_executor_job(
+                    self._find_script_at_revision, script_id, revision
+                )
+                if script_file is None:
+                    _LOGGER.error(f"No backup found for script ID {script_id} at revision {revision}")
                     return
 
-                script_file = script_files[0]
+                code = await self.hass.async_add_executor_job(
+                    self.storage.read_file, revision, script_file
+                )
+                script_file = f"{script_file}@{revision}"
+            else:
+                if backup_path:
+                    script_file = Path(backup_path)
+                else:
+                    # Find the script in the default backup location
+                    script_file = find_script_backup(
+                        Path(self.backup_path) / self.device_id, script_id
+                    )
 
-            # Read script code
-            with open(script_file, "r", encoding="utf-8") as f:
-                code = f.read()
+                    if script_file is None:
+                        _LOGGER.error(f"No backup found for script ID {script_id}")
+                        return
+
+                # Read script code
+                with open(script_file, "r", encoding="utf-8") as f:
+                    code = f.read()
 
             # Upload to device
             _LOGGER.info(f"Restoring script ID {script_id} from {script_file}")
-            async with ShellyClient(self.host, self.port, self.password) as client:
+            async with self._open_client() as client:
                 await client.put_script_code(script_id, code)
             _LOGGER.info(f"Script ID {script_id} restored successfully")
 
@@ -444,36 +1631,305 @@ class ShellyBackupCoordinator:
             _LOGGER.error(f"Error restoring script: {err}")
             raise
 
-    async def restore_config(self, backup_path: str | None = None) -> None:
-        """Restore device configuration from backup."""
+    def _find_script_at_revision(self, script_id: int, revision: str) -> str | None:
+        """Return the repository path of a script's code at `revision`."""
+        for name in self.storage.list_files(revision, self.device_id):
+            if name.startswith(f"{script_id}_") and name.endswith(".js"):
+                return f"{self.device_id}/{name}"
+        return None
+
+    async def restore_config(
+            self,
+            backup_path: str | None = None,
+            revision: str | None = None,
+    ) -> None:
+        """Restore device configuration ahead of any queued background work."""
+        await self._run_job(
+            PRIORITY_INTERACTIVE,
+            partial(self._restore_config, backup_path, revision),
+            "Configuration restore",
+        )
+
+    async def _restore_config(
+            self,
+            backup_path: str | None = None,
+            revision: str | None = None,
+    ) -> None:
+        """Restore device configuration from backup, optionally from a git revision."""
         try:
-            if not await self.update_device_status():
+            if not await self.async_ensure_available():
                 _LOGGER.error("Device is offline, cannot restore configuration")
                 return
 
-            if backup_path:
-                config_file = Path(backup_path)
+            if revision:
+                if self.storage is None:
+                    _LOGGER.error("Restoring a revision requires the git storage backend")
+                    return
+
+                config_file = f"{self.device_id}/{DEVICE_CONFIG_FILE}@{revision}"
+                config_data = json.loads(
+                    await self.hass.async_add_executor_job(
+                        self.storage.read_file, revision, f"{self.device_id}/{DEVICE_CONFIG_FILE}"
+                    )
+                )
             else:
-                # Use default backup location
-                device_backup_path = Path(self.backup_path) / self.device_id
-                config_file = device_backup_path / "device_config.json"
+                if backup_path:
+                    config_file = Path(backup_path)
+                else:
+                    # Use default backup location
+                    device_backup_path = Path(self.backup_path) / self.device_id
+                    config_file = device_backup_path / DEVICE_CONFIG_FILE
 
-            if not config_file.exists():
-                _LOGGER.error(f"No configuration backup found at {config_file}")
-                return
+                if not config_file.exists():
+                    _LOGGER.error(f"No configuration backup found at {config_file}")
+                    return
 
-            # Read configuration
-            with open(config_file, "r", encoding="utf-8") as f:
-                config_data = json.load(f)
+                # Read configuration
+                with open(config_file, "r", encoding="utf-8") as f:
+                    config_data = json.load(f)
 
             config = config_data.get("config", {})
 
             # Restore configuration to device
             _LOGGER.info(f"Restoring configuration from {config_file}")
-            async with ShellyClient(self.host, self.port, self.password) as client:
+            async with self._open_client() as client:
                 await client.set_config(config)
             _LOGGER.info(f"Configuration restored successfully for device {self.device_id}")
 
         except Exception as err:
             _LOGGER.error(f"Error restoring configuration: {err}")
             raise
+
+    async def restore_data(self, include: list[str], revision: str | None = None) -> None:
+        """Restore device data ahead of any queued background work."""
+        await self._run_job(
+            PRIORITY_INTERACTIVE,
+            partial(self._restore_data, include, revision),
+            "Device data restore",
+        )
+
+    async def _restore_data(self, include: list[str], revision: str | None = None) -> None:
+        """Restore KVS entries, schedules and webhooks from backup in one go."""
+        try:
+            if not await self.async_ensure_available():
+                _LOGGER.error("Device is offline, cannot restore device data")
+                return
+
+            if revision and self.storage is None:
+                _LOGGER.error("Restoring a revision requires the git storage backend")
+                return
+
+            async with self._open_client() as client:
+                methods = await self._async_supported_methods(client)
+                for part in include:
+                    if methods is not None and DEVICE_DATA_METHODS[part] not in methods:
+                        _LOGGER.warning(f"Device {self.device_id} has no {part}, skipping its restore")
+                        continue
+
+                    file_name, _ = DEVICE_DATA_FILES[part]
+                    data = await self._read_device_data(file_name, revision)
+                    if data is None:
+                        _LOGGER.error(f"No {part} backup found for device {self.device_id}")
+                        continue
+
+                    await DEVICE_DATA_RESTORERS[part](client, data, self.device_id)
+
+            _LOGGER.info(f"Restored {', '.join(include)} for device {self.device_id}")
+
+        except Exception as err:
+            _LOGGER.error(f"Error restoring device data: {err}")
+            raise
+
+    async def _read_device_data(self, file_name: str, revision: str | None) -> dict | None:
+        """Read a device data backup file, from disk or from a git revision."""
+        if revision:
+            content = await self.hass.async_add_executor_job(
+                self.storage.read_file, revision, f"{self.device_id}/{file_name}"
+            )
+            return json.loads(content)
+
+        return await self.hass.async_add_executor_job(self._read_device_file, file_name)
+
+    def _read_device_file(self, file_name: str) -> dict | None:
+        """Read a device data backup file from disk, None if missing (runs in the executor)."""
+        data_file = Path(self.backup_path) / self.device_id / file_name
+        if not data_file.exists():
+            return None
+        with open(data_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    async def sync_scripts(
+            self,
+            sources: dict[str, str],
+            delete: bool = False,
+            verify: bool = False,
+    ) -> dict[str, list[str]]:
+        """Deploy scripts to the device, ahead of queued backups."""
+        return await self._run_job(
+            PRIORITY_RECOVERY,
+            partial(self._sync_scripts, sources, delete, verify),
+            "Script sync",
+        )
+
+    async def _sync_scripts(
+            self,
+            sources: dict[str, str],
+            delete: bool,
+            verify: bool,
+    ) -> dict[str, list[str]]:
+        """Make the device scripts match `sources`, then back up what changed.
+
+        No device info is read first: `Script.List` doubles as the liveness
+        check, so an unchanged deploy costs one call.
+        """
+        stored_hashes = await self.hass.async_add_executor_job(
+            load_script_hashes, Path(self.backup_path) / self.device_id
+        )
+
+        # Every outcome is recorded below, so a half-open probe never stays pending
+        if not self.breaker.allow_request():
+            raise ConnectionError(f"Device {self.device_id} is unreachable, retrying later")
+        try:
+            async with self._open_client() as client:
+                report = await sync_scripts(client, sources, stored_hashes, delete, verify)
+        except (aiohttp.ClientResponseError, RpcError):
+            # The device answered, it only rejected a request
+            self._record_success()
+            raise
+        except asyncio.CancelledError:
+            self._record_failure()
+            raise
+        except Exception as err:
+            self.last_error = str(err) or type(err).__name__
+            self._record_failure()
+            raise
+        self._record_success()
+
+        changes = sum(len(report[action]) for action in ("created", "updated", "enabled", "deleted"))
+        if changes:
+            _LOGGER.info(f"Deployed {changes} script changes to {self.device_id}")
+            # Refresh the backup so its stored hashes match the device again
+            try:
+                await self._backup_scripts()
+            except Exception:  # noqa: BLE001 - logged by the backup, the deploy succeeded
+                pass
+        return report
+
+    async def restore_from_checkpoint(self, checkpoint: RestoreCheckpoint, save) -> None:
+        """Restore the items of a restore_all job, ahead of queued backups."""
+        await self._run_job(
+            PRIORITY_RECOVERY,
+            partial(self._restore_from_checkpoint, checkpoint, save),
+            "Fleet restore",
+        )
+
+    async def _restore_from_checkpoint(self, checkpoint: RestoreCheckpoint, save) -> None:
+        """Restore every item not done yet, skipping items whose live hash matches.
+
+        `save` is awaited after each item so an interrupted job resumes
+        where it stopped.
+        """
+        device_id = self.device_id
+        revision = checkpoint.revision
+        if revision and self.storage is None:
+            raise ValueError("Restoring a revision requires the git storage backend")
+
+        if not await self.async_ensure_available():
+            raise ConnectionError(f"Device {device_id} is offline")
+
+        sources = await self.hass.async_add_executor_job(self._list_script_sources, revision)
+        failed = False
+        live_scripts: dict[int, dict] | None = None
+
+        async with self._open_client() as client:
+            if checkpoint.include_config and not checkpoint.is_done(device_id, ITEM_CONFIG):
+                try:
+                    status = await self._restore_config_item(client, revision)
+                except Exception as err:  # noqa: BLE001 - recorded, retried on resume
+                    _LOGGER.error(f"Error restoring configuration of {device_id}: {err}")
+                    status = STATUS_FAILED
+                failed |= status == STATUS_FAILED
+                checkpoint.mark(device_id, ITEM_CONFIG, status)
+                await save()
+
+            for script_id, source in sorted(sources.items()):
+                item = script_item(script_id)
+                if checkpoint.is_done(device_id, item):
+                    continue
+                try:
+                    if live_scripts is None:
+                        live_scripts = await list_live_scripts(client)
+                    status = await self._restore_script_item(
+                        client, script_id, source, revision, live_scripts
+                    )
+                except Exception as err:  # noqa: BLE001 - recorded, retried on resume
+                    _LOGGER.error(f"Error restoring script {script_id} of {device_id}: {err}")
+                    status = STATUS_FAILED
+                failed |= status == STATUS_FAILED
+                checkpoint.mark(device_id, item, status)
+                await save()
+
+        if not failed:
+            checkpoint.complete_device(device_id)
+            await save()
+
+    def _list_script_sources(self, revision: str | None) -> dict[int, Path | str]:
+        """Return the backup of every script: a file, or a repository path at `revision`."""
+        if not revision:
+            return list_script_backups(Path(self.backup_path) / self.device_id)
+
+        sources = {}
+        for name in self.storage.list_files(revision, self.device_id):
+            script_id, _, rest = name.partition("_")
+            if script_id.isdigit() and rest.endswith(".js"):
+                sources[int(script_id)] = f"{self.device_id}/{name}"
+        return sources
+
+    def _read_script_source(self, source: Path | str, revision: str | None) -> str:
+        """Return the code of a script backup (runs in the executor)."""
+        if revision:
+            return self.storage.read_file(revision, source)
+        return Path(source).read_text(encoding="utf-8")
+
+    def _read_script_metadata(self, source: Path | str, revision: str | None) -> dict:
+        """Return the metadata saved with a script backup, or {} (runs in the executor)."""
+        if not revision:
+            return read_script_metadata(Path(source))
+        try:
+            metadata_path = str(source).removesuffix(".js") + ".json"
+            return json.loads(self.storage.read_file(revision, metadata_path))
+        except (GitStorageError, ValueError):
+            return {}
+
+    async def _restore_script_item(
+            self,
+            client: ShellyClient,
+            script_id: int,
+            source: Path | str,
+            revision: str | None,
+            live_scripts: dict[int, dict],
+    ) -> str:
+        """Upload one script unless the live code already matches the backup.
+
+        Scripts missing from the device are created again, see `restore_script`.
+        """
+        code = await self.hass.async_add_executor_job(self._read_script_source, source, revision)
+        metadata = await self.hass.async_add_executor_job(self._read_script_metadata, source, revision)
+        if await restore_script(client, script_id, code, metadata, live_scripts, self.device_id):
+            return STATUS_RESTORED
+        return STATUS_UNCHANGED
+
+    async def _restore_config_item(self, client: ShellyClient, revision: str | None) -> str:
+        """Restore the configuration unless the live one already matches the backup."""
+        data = await self._read_device_data(DEVICE_CONFIG_FILE, revision)
+        if data is None:
+            _LOGGER.error(f"No configuration backup found for device {self.device_id}")
+            return STATUS_FAILED
+
+        config = data.get("config", {})
+        if config_hash(await client.get_config()) == config_hash(config):
+            return STATUS_UNCHANGED
+
+        await client.set_config(config)
+        _LOGGER.info(f"Restored configuration of {self.device_id}")
+        return STATUS_RESTORED
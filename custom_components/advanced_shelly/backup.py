@@ -0,0 +1,415 @@
+"""On-disk backup and restore of one Shelly device.
+
+Kept free of Home Assistant imports so the coordinator and the command line
+tool write the same layout. Blocking file access runs on the default
+executor of the running loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+
+from .const import (
+    DATA_KVS,
+    DATA_SCHEDULES,
+    DATA_WEBHOOKS,
+    DEVICE_CONFIG_FILE,
+    DEVICE_KVS_FILE,
+    DEVICE_SCHEDULES_FILE,
+    DEVICE_WEBHOOKS_FILE,
+    SCRIPT_PIPELINE_DEPTH,
+)
+from .shelly_client import ShellyClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device data backed up next to the configuration: part -> (file, payload key)
+DEVICE_DATA_FILES = {
+    DATA_KVS: (DEVICE_KVS_FILE, "kvs"),
+    DATA_SCHEDULES: (DEVICE_SCHEDULES_FILE, "jobs"),
+    DATA_WEBHOOKS: (DEVICE_WEBHOOKS_FILE, "hooks"),
+}
+
+# Method that tells whether a device has the component of a device data part
+DEVICE_DATA_METHODS = {
+    DATA_KVS: "KVS.GetMany",
+    DATA_SCHEDULES: "Schedule.List",
+    DATA_WEBHOOKS: "Webhook.List",
+}
+
+
+class DeviceBackup:
+    """Write the backup of one device into `<backup_path>/<device_id>/`."""
+
+    def __init__(
+            self,
+            client: ShellyClient,
+            backup_path: str | Path,
+            device_id: str,
+            device_name: str | None,
+            with_timestamps: bool = True,
+            methods: set[str] | None = None,
+    ) -> None:
+        """Initialize the device backup.
+
+        `with_timestamps` adds a `backup_time` field to the device files; it
+        is turned off when a git history already records when a backup ran.
+        `methods` holds the RPC methods the device supports, if known, so
+        components it lacks are not asked for.
+        """
+        self.client = client
+        self.device_id = device_id
+        self.device_name = device_name
+        self.path = Path(backup_path) / device_id
+        self.with_timestamps = with_timestamps
+        self.methods = methods
+
+    async def run(self) -> list[dict]:
+        """Backup configuration, device data and scripts.
+
+        Returns the device's script list. Configuration and device data
+        failures are logged and do not stop the script backup.
+        """
+        loop = asyncio.get_running_loop()
+
+        # Create device-specific backup directory
+        await loop.run_in_executor(None, partial(self.path.mkdir, parents=True, exist_ok=True))
+
+        # Backup device configuration
+        await self.backup_config()
+
+        # Backup KVS, schedules and webhooks used by the scripts
+        await self.backup_device_data()
+
+        # Backup scripts
+        scripts_response = await self.client.get_script_list()
+        scripts = scripts_response.get("scripts", [])
+
+        # Clean up backups of scripts that no longer exist
+        await loop.run_in_executor(
+            None, self.cleanup_old_backups, {str(script.get("id")) for script in scripts}
+        )
+
+        if not scripts:
+            _LOGGER.info(f"No scripts found on device {self.device_id}")
+        else:
+            backed_up_count = await self.backup_scripts(scripts)
+            _LOGGER.debug(
+                f"Backed up {backed_up_count} of {len(scripts)} scripts "
+                f"for device {self.device_id}"
+            )
+
+        return scripts
+
+    def _device_file_data(self, **payload) -> dict:
+        """Return the common content of a device level backup file."""
+        data = {
+            "device_id": self.device_id,
+            "device_name": self.device_name,
+            **payload,
+        }
+        if self.with_timestamps:
+            data["backup_time"] = datetime.now(timezone.utc).isoformat()
+        return data
+
+    def _write_device_file(self, file_name: str, data: dict) -> None:
+        """Save a device level backup file (runs in the executor)."""
+        with open(self.path / file_name, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    async def backup_config(self) -> None:
+        """Backup device configuration."""
+        try:
+            _LOGGER.debug(f"Backing up configuration for device {self.device_id}")
+
+            config = await self.client.get_config()
+
+            # Save full configuration
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write_device_file, DEVICE_CONFIG_FILE, self._device_file_data(config=config)
+            )
+
+            _LOGGER.info(f"Backed up configuration for device {self.device_id}")
+
+        except Exception as err:
+            _LOGGER.error(f"Error backing up configuration: {err}")
+            # Don't raise - continue with script backup even if config backup fails
+
+    async def backup_device_data(self) -> None:
+        """Backup KVS entries, schedules and webhooks, one file each."""
+        fetchers = {
+            DATA_KVS: self.client.get_all_kvs,
+            DATA_SCHEDULES: lambda: _list_items(self.client.schedule_list(), "jobs"),
+            DATA_WEBHOOKS: lambda: _list_items(self.client.webhook_list(), "hooks"),
+        }
+
+        for part, fetch in fetchers.items():
+            if self.methods is not None and DEVICE_DATA_METHODS[part] not in self.methods:
+                _LOGGER.debug(f"Device {self.device_id} has no {part}, skipping its backup")
+                continue
+
+            file_name, key = DEVICE_DATA_FILES[part]
+            try:
+                items = await fetch()
+
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._write_device_file, file_name, self._device_file_data(**{key: items})
+                )
+
+                _LOGGER.info(f"Backed up {len(items)} {part} entries for device {self.device_id}")
+            except Exception as err:
+                # Older firmware may lack some of these components
+                _LOGGER.error(f"Error backing up {part}: {err}")
+
+    async def backup_scripts(self, scripts: list[dict]) -> int:
+        """Fetch and save every script, overlapping RPC calls with disk writes.
+
+        The fetch side pulls code at the pace of the client throttle into a
+        bounded queue, while a writer drains it on the executor. Returns the
+        number of scripts saved.
+        """
+        queue: asyncio.Queue[tuple[dict, str] | None] = asyncio.Queue(
+            maxsize=SCRIPT_PIPELINE_DEPTH
+        )
+        writer = asyncio.create_task(self._drain_script_queue(queue))
+
+        try:
+            for script in scripts:
+                script_id = script.get("id")
+                script_name = script.get("name", f"script_{script_id}")
+
+                _LOGGER.debug(f"Backing up script {script_name} (ID: {script_id})")
+
+                try:
+                    code_response = await self.client.get_script_code(script_id)
+                except Exception as err:
+                    _LOGGER.error(f"Error backing up script {script_name}: {err}")
+                    continue
+
+                await queue.put((script, code_response.get("data", "")))
+        finally:
+            # Let the writer finish what was already fetched
+            await queue.put(None)
+            backed_up_count = await writer
+
+        return backed_up_count
+
+    async def _drain_script_queue(self, queue: asyncio.Queue[tuple[dict, str] | None]) -> int:
+        """Write fetched scripts to disk until the end marker arrives."""
+        loop = asyncio.get_running_loop()
+        backed_up_count = 0
+        while (item := await queue.get()) is not None:
+            script, code = item
+            script_name = script.get("name", f"script_{script.get('id')}")
+            try:
+                await loop.run_in_executor(None, self._write_script_files, script, code)
+                _LOGGER.info(f"Backed up script {script_name} (ID: {script.get('id')})")
+                backed_up_count += 1
+            except Exception as err:
+                _LOGGER.error(f"Error backing up script {script_name}: {err}")
+        return backed_up_count
+
+    def _write_script_files(self, script: dict, code: str) -> None:
+        """Save script code and metadata (runs in the executor)."""
+        script_id = script.get("id")
+        script_name = script.get("name", f"script_{script_id}")
+
+        # Save script code
+        script_file = self.path / f"{script_id}_{script_name}.js"
+        with open(script_file, "w", encoding="utf-8") as f:
+            f.write(code)
+
+        # Save script metadata
+        metadata = {
+            "id": script_id,
+            "name": script_name,
+            "enable": script.get("enable", False),
+            "code_sha256": code_hash(code),
+            "device_id": self.device_id,
+            "device_name": self.device_name,
+        }
+
+        metadata_file = self.path / f"{script_id}_{script_name}.json"
+        with open(metadata_file, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+
+    def cleanup_old_backups(self, active_script_ids: set[str]) -> None:
+        """Remove backup files for scripts that no longer exist on the device."""
+        if not self.path.exists():
+            return
+
+        deleted_count = 0
+        for file_path in self.path.iterdir():
+            if not file_path.is_file():
+                continue
+
+            # Skip device config, KVS, schedules and webhooks files
+            if file_path.name.startswith("device_"):
+                continue
+
+            # Extract script ID from filename (format: {script_id}_{script_name}.{ext})
+            filename = file_path.stem  # Without extension
+            try:
+                # Script ID is the first part before underscore
+                script_id = filename.split("_", 1)[0]
+
+                # If script ID is not in active scripts, delete the file
+                if script_id not in active_script_ids:
+                    _LOGGER.info(f"Deleting old backup file: {file_path.name}")
+                    file_path.unlink()
+                    deleted_count += 1
+            except (IndexError, ValueError) as err:
+                _LOGGER.warning(f"Could not parse script ID from filename {file_path.name}: {err}")
+
+        if deleted_count > 0:
+            _LOGGER.info(f"Cleaned up {deleted_count} old backup files")
+
+
+def code_hash(code: str) -> str:
+    """Return the SHA-256 of script code, to compare backups with live code."""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def config_hash(config: dict) -> str:
+    """Return the SHA-256 of a device configuration, independent of key order."""
+    return code_hash(json.dumps(config, sort_keys=True))
+
+
+async def _list_items(request, key: str) -> list:
+    """Return the list held by `key` of a List RPC response."""
+    response = await request
+    return response.get(key, [])
+
+
+def find_script_backup(device_backup_path: Path, script_id: int) -> Path | None:
+    """Return the code file of a script backup, if there is one."""
+    script_files = sorted(device_backup_path.glob(f"{script_id}_*.js"))
+    return script_files[0] if script_files else None
+
+
+def list_script_backups(device_backup_path: Path) -> dict[int, Path]:
+    """Return the code file of every backed up script, keyed by script ID."""
+    backups = {}
+    for metadata_file in sorted(device_backup_path.glob("*.json")):
+        if metadata_file.name.startswith("device_"):
+            continue
+        with open(metadata_file, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        code_file = metadata_file.with_suffix(".js")
+        if code_file.exists():
+            backups[int(metadata["id"])] = code_file
+    return backups
+
+
+def load_script_hashes(device_backup_path: Path) -> dict[int, str]:
+    """Return the code hash stored with every script backup, keyed by script ID.
+
+    Backups written before hashes were stored are left out.
+    """
+    hashes = {}
+    for metadata_file in sorted(device_backup_path.glob("*.json")):
+        if metadata_file.name.startswith("device_"):
+            continue
+        with open(metadata_file, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if "code_sha256" in metadata:
+            hashes[int(metadata["id"])] = metadata["code_sha256"]
+    return hashes
+
+
+def read_script_metadata(code_file: Path) -> dict:
+    """Return the metadata saved next to a script code file, or {} if there is none."""
+    try:
+        with open(code_file.with_suffix(".json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+async def list_live_scripts(client: ShellyClient) -> dict[int, dict]:
+    """Return the scripts of a device, keyed by ID."""
+    scripts = (await client.get_script_list()).get("scripts", [])
+    return {script["id"]: script for script in scripts}
+
+
+async def restore_script(
+        client: ShellyClient,
+        script_id: int,
+        code: str,
+        metadata: dict,
+        live_scripts: dict[int, dict],
+        device_id: str,
+) -> bool:
+    """Upload one script backup unless the live code already matches it.
+
+    A script missing from the device, e.g. after a factory reset, is created
+    again with the name and enable state of its `metadata`, unless a script
+    of that name exists already. `live_scripts` comes from `list_live_scripts`
+    and is updated with created scripts. Returns False if nothing was uploaded.
+    """
+    if script_id not in live_scripts:
+        name = metadata.get("name", f"script_{script_id}")
+        existing = next((s for s in live_scripts.values() if s.get("name") == name), None)
+        if existing is None:
+            new_id = (await client.script_create(name))["id"]
+            await client.put_script_code(new_id, code)
+            enable = metadata.get("enable", False)
+            await client.script_set_config(new_id, {"enable": enable})
+            live_scripts[new_id] = {"id": new_id, "name": name, "enable": enable}
+            _LOGGER.info(f"Recreated script {name} (was ID {script_id}) of {device_id} as ID {new_id}")
+            return True
+        script_id = existing["id"]
+
+    live_code = (await client.get_script_code(script_id)).get("data", "")
+    if code_hash(live_code) == code_hash(code):
+        return False
+
+    await client.put_script_code(script_id, code)
+    _LOGGER.info(f"Restored script ID {script_id} of {device_id}")
+    return True
+
+
+async def restore_kvs(client: ShellyClient, data: dict, device_id: str) -> None:
+    """Write back only the KVS entries that differ from the device."""
+    values = data.get("kvs", {})
+    current = await client.get_all_kvs()
+    changed = {
+        key: value
+        for key, value in values.items()
+        if key not in current or current[key] != value
+    }
+    for key, value in changed.items():
+        await client.kvs_set(key, value)
+    _LOGGER.info(f"Restored {len(changed)} of {len(values)} KVS entries for device {device_id}")
+
+
+async def restore_schedules(client: ShellyClient, data: dict, device_id: str) -> None:
+    """Replace all schedules on the device with the backed up ones."""
+    jobs = data.get("jobs", [])
+    await client.schedule_delete_all()
+    for job in jobs:
+        # The device assigns new IDs
+        await client.schedule_create({k: v for k, v in job.items() if k != "id"})
+    _LOGGER.info(f"Restored {len(jobs)} schedules for device {device_id}")
+
+
+async def restore_webhooks(client: ShellyClient, data: dict, device_id: str) -> None:
+    """Replace all webhooks on the device with the backed up ones."""
+    hooks = data.get("hooks", [])
+    await client.webhook_delete_all()
+    for hook in hooks:
+        # The device assigns new IDs
+        await client.webhook_create({k: v for k, v in hook.items() if k != "id"})
+    _LOGGER.info(f"Restored {len(hooks)} webhooks for device {device_id}")
+
+
+DEVICE_DATA_RESTORERS = {
+    DATA_KVS: restore_kvs,
+    DATA_SCHEDULES: restore_schedules,
+    DATA_WEBHOOKS: restore_webhooks,
+}
@@ -1,6 +1,8 @@
 """Binary sensor platform for Shelly Scripts Backup."""
 from __future__ import annotations
 
+from datetime import timedelta
+
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorDeviceClass,
@@ -9,9 +11,11 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
-from . import SIGNAL_UPDATE_SHELLY
+from . import SIGNAL_UPDATE_SHELLY, SIGNAL_SCRIPT_STATUS, SIGNAL_NEW_SCRIPTS
+from .fleet import FleetManager, SIGNAL_NEW_FLEET_DEVICE
 
 
 async def async_setup_entry(
@@ -20,12 +24,57 @@ async def async_setup_entry(
         async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Shelly backup binary sensors."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    managed = hass.data[DOMAIN][entry.entry_id]
+    if not isinstance(managed, FleetManager):
+        _async_add_device_entities(hass, entry, managed, async_add_entities)
+        return
+
+    # Fleet devices get their entities once they have been identified
+    @callback
+    def add_device(coordinator) -> None:
+        _async_add_device_entities(hass, entry, coordinator, async_add_entities)
+
+    for coordinator in managed.identified:
+        add_device(coordinator)
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_NEW_FLEET_DEVICE.format(entry.entry_id), add_device)
+    )
+
 
+@callback
+def _async_add_device_entities(
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator,
+        async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add the entities of one device, and script entities as scripts appear."""
     async_add_entities([
         ShellyDeviceConnectivitySensor(coordinator, entry),
     ])
 
+    known_scripts: set[int] = set()
+
+    @callback
+    def add_script_sensors() -> None:
+        """Add running sensors for scripts seen for the first time."""
+        new_scripts = set(coordinator.script_status) - known_scripts
+        if not new_scripts:
+            return
+        known_scripts.update(new_scripts)
+        async_add_entities([
+            ShellyScriptRunningSensor(coordinator, entry, script_id)
+            for script_id in sorted(new_scripts)
+        ])
+
+    add_script_sensors()
+    if coordinator.device_id:
+        entry.async_on_unload(
+            async_dispatcher_connect(
+                hass, SIGNAL_NEW_SCRIPTS.format(coordinator.device_id), add_script_sensors
+            )
+        )
+
 
 class ShellyDeviceConnectivitySensor(BinarySensorEntity):
     """Binary sensor showing device online/offline status."""
@@ -37,7 +86,7 @@ class ShellyDeviceConnectivitySensor(BinarySensorEntity):
         """Initialize the binary sensor."""
         self._coordinator = coordinator
         self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_connectivity"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_connectivity"
         self._attr_name = "Connectivity"
 
     async def async_added_to_hass(self) -> None:
@@ -64,8 +113,8 @@ class ShellyDeviceConnectivitySensor(BinarySensorEntity):
     def device_info(self):
         """Return device information."""
         return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": f"Shelly Device {self._coordinator.device_name or self._entry.entry_id}",
+            "identifiers": {(DOMAIN, self._coordinator.unique_prefix)},
+            "name": f"Shelly Device {self._coordinator.device_name or self._coordinator.unique_prefix}",
             "manufacturer": "Shelly",
             "model": "Script Backup",
         }
@@ -73,7 +122,72 @@ class ShellyDeviceConnectivitySensor(BinarySensorEntity):
     @property
     def extra_state_attributes(self):
         """Return additional attributes."""
+        breaker = self._coordinator.breaker
+        retry_in = breaker.retry_in
         return {
             "last_seen": self._coordinator.last_seen,
             "device_id": self._coordinator.device_id,
-        }
\ No newline at end of file
+            "circuit_state": breaker.state,
+            "consecutive_failures": breaker.failures,
+            "next_probe": dt_util.utcnow() + timedelta(seconds=retry_in) if retry_in else None,
+        }
+
+
+class ShellyScriptRunningSensor(BinarySensorEntity):
+    """Binary sensor showing whether a script is running, with its errors."""
+
+    _attr_device_class = BinarySensorDeviceClass.RUNNING
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, entry: ConfigEntry, script_id: int) -> None:
+        """Initialize the binary sensor."""
+        self._coordinator = coordinator
+        self._entry = entry
+        self._script_id = script_id
+        script_name = coordinator.script_names.get(script_id, f"script_{script_id}")
+        self._attr_unique_id = f"{coordinator.unique_prefix}_script_{script_id}_running"
+        self._attr_name = f"Script {script_name} running"
+
+    async def async_added_to_hass(self) -> None:
+        """Register callbacks."""
+        @callback
+        def update():
+            self.async_write_ha_state()
+
+        # Status changes, plus device availability changes
+        for signal in (SIGNAL_SCRIPT_STATUS, SIGNAL_UPDATE_SHELLY):
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    signal.format(self._coordinator.device_id),
+                    update
+                )
+            )
+
+    @property
+    def is_on(self) -> bool:
+        """Return true if the script is running."""
+        return self._coordinator.script_status.get(self._script_id, {}).get("running", False)
+
+    @property
+    def device_info(self):
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._coordinator.unique_prefix)},
+            "name": f"Shelly Device {self._coordinator.device_name or self._coordinator.unique_prefix}",
+            "manufacturer": "Shelly",
+            "model": "Script Backup",
+        }
+
+    @property
+    def extra_state_attributes(self):
+        """Return additional attributes."""
+        return {
+            "script_id": self._script_id,
+            "errors": self._coordinator.script_status.get(self._script_id, {}).get("errors", []),
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self._coordinator.is_available and self._script_id in self._coordinator.script_status
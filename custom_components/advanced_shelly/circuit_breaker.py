@@ -0,0 +1,97 @@
+"""Per-device circuit breaker for the Advanced Shelly integration."""
+from __future__ import annotations
+
+import time
+
+from .const import (
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_BREAKER_RESET,
+    MAX_BREAKER_RESET,
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fail fast for a device that keeps failing.
+
+    The circuit opens after `failure_threshold` consecutive failures. While
+    open, requests are refused until the probe delay elapsed; then a single
+    half-open probe is let through. A failed probe reopens the circuit with
+    a doubled delay (capped at `max_reset_timeout`), a successful one closes it.
+    """
+
+    __slots__ = (
+        "failure_threshold", "reset_timeout", "max_reset_timeout", "failures",
+        "_state", "_current_timeout", "_opened_until", "_probe_in_flight",
+    )
+
+    def __init__(
+            self,
+            failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+            reset_timeout: float = DEFAULT_BREAKER_RESET,
+            max_reset_timeout: float = MAX_BREAKER_RESET,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.failures = 0
+        self._state = STATE_CLOSED
+        self._current_timeout = reset_timeout
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Return the circuit state, reporting half-open once a probe is due."""
+        if self._state == STATE_OPEN and (
+                self._probe_in_flight or time.monotonic() >= self._opened_until
+        ):
+            return STATE_HALF_OPEN
+        return self._state
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until the next half-open probe (0 if not open)."""
+        if self._state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._opened_until - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent to the device now."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and not self._probe_in_flight:
+            # Only one probe at a time, everyone else keeps failing fast
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self.failures = 0
+        self._state = STATE_CLOSED
+        self._current_timeout = self.reset_timeout
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening or reopening the circuit if needed."""
+        self.failures += 1
+        if self._probe_in_flight:
+            # Failed half-open probe: back off exponentially
+            self._probe_in_flight = False
+            self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+            self._open()
+        elif self._state == STATE_CLOSED and self.failures >= self.failure_threshold:
+            self._current_timeout = self.reset_timeout
+            self._open()
+
+    def _open(self) -> None:
+        """Open the circuit until the current probe delay elapsed."""
+        self._state = STATE_OPEN
+        self._opened_until = time.monotonic() + self._current_timeout
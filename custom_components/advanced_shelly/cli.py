@@ -0,0 +1,216 @@
+"""Command line tool for headless fleet backup and restore.
+
+Runs the same backup and restore code as the integration, without Home
+Assistant, for every device of an inventory file:
+
+    python custom_components/advanced_shelly/cli.py backup inventory.yaml --concurrency 16
+    python custom_components/advanced_shelly/cli.py restore inventory.csv --config --data
+
+Needs aiohttp (and PyYAML for YAML inventories).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):
+    # Started as a script: register the integration directory as a package
+    # without running its Home Assistant specific __init__
+    import importlib.machinery
+    import importlib.util
+
+    _spec = importlib.machinery.ModuleSpec("advanced_shelly", None, is_package=True)
+    _package = importlib.util.module_from_spec(_spec)
+    _package.__path__ = [str(Path(__file__).resolve().parent)]
+    sys.modules["advanced_shelly"] = _package
+    __package__ = "advanced_shelly"
+
+from .backup import (
+    DEVICE_DATA_FILES,
+    DEVICE_DATA_RESTORERS,
+    DeviceBackup,
+    list_live_scripts,
+    list_script_backups,
+    read_script_metadata,
+    restore_script,
+)
+from .const import (
+    CONF_HOST,
+    CONF_PORT,
+    CONF_PASSWORD,
+    CONF_BACKUP_PATH,
+    DEFAULT_IMPORT_CONCURRENCY,
+    DEVICE_CONFIG_FILE,
+    RESTORABLE_DATA,
+)
+from .git_storage import get_git_storage, git_available
+from .inventory import InventoryError, load_inventory, normalize_row
+from .shelly_client import ShellyClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def backup_device(row: dict, args: argparse.Namespace) -> dict:
+    """Backup one device into the usual on-disk layout."""
+    backup_path = args.backup_path or row[CONF_BACKUP_PATH]
+    async with ShellyClient(row[CONF_HOST], row[CONF_PORT], row.get(CONF_PASSWORD)) as client:
+        device_info = await client.get_device_info()
+        device_id = device_info.get("id", "unknown")
+
+        device_backup = DeviceBackup(
+            client,
+            backup_path,
+            device_id,
+            device_info.get("name", "unknown"),
+            with_timestamps=not args.git,
+        )
+        scripts = await device_backup.run()
+
+    if args.git:
+        storage = get_git_storage(backup_path)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, storage.ensure_repo)
+        await loop.run_in_executor(
+            None,
+            storage.commit,
+            device_id,
+            f"Backup {device_info.get('name', 'unknown')} ({device_id}): {len(scripts)} scripts",
+        )
+
+    return {"device_id": device_id, "scripts": len(scripts)}
+
+
+async def restore_device(row: dict, args: argparse.Namespace) -> dict:
+    """Restore the scripts (and optionally configuration and device data) of one device."""
+    backup_path = args.backup_path or row[CONF_BACKUP_PATH]
+    async with ShellyClient(row[CONF_HOST], row[CONF_PORT], row.get(CONF_PASSWORD)) as client:
+        device_info = await client.get_device_info()
+        device_id = device_info.get("id", "unknown")
+        device_backup_path = Path(backup_path) / device_id
+        if not device_backup_path.is_dir():
+            raise FileNotFoundError(f"No backup found at {device_backup_path}")
+
+        if args.config:
+            with open(device_backup_path / DEVICE_CONFIG_FILE, "r", encoding="utf-8") as f:
+                await client.set_config(json.load(f).get("config", {}))
+
+        # Unchanged scripts are skipped, missing ones are created again
+        script_backups = list_script_backups(device_backup_path)
+        live_scripts = await list_live_scripts(client) if script_backups else {}
+        for script_id, code_file in script_backups.items():
+            await restore_script(
+                client,
+                script_id,
+                code_file.read_text(encoding="utf-8"),
+                read_script_metadata(code_file),
+                live_scripts,
+                device_id,
+            )
+
+        if args.data:
+            for part in RESTORABLE_DATA:
+                data_file = device_backup_path / DEVICE_DATA_FILES[part][0]
+                if data_file.exists():
+                    with open(data_file, "r", encoding="utf-8") as f:
+                        await DEVICE_DATA_RESTORERS[part](client, json.load(f), device_id)
+
+    return {"device_id": device_id, "scripts": len(script_backups)}
+
+
+async def run_fleet(rows: list[dict], args: argparse.Namespace) -> list[dict]:
+    """Run the selected operation for every device, `args.concurrency` at a time."""
+    operation = backup_device if args.command == "backup" else restore_device
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run_one(row: dict) -> dict:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                result = {"host": row[CONF_HOST], "ok": True, **await operation(row, args)}
+            except Exception as err:  # noqa: BLE001 - report and continue with the fleet
+                result = {"host": row[CONF_HOST], "ok": False, "error": str(err) or type(err).__name__}
+            result["elapsed"] = time.monotonic() - started
+
+        status = f"{result['scripts']} scripts" if result["ok"] else f"FAILED: {result['error']}"
+        print(f"{result['host']:<24} {result.get('device_id', '-'):<36} {result['elapsed']:6.2f}s  {status}")
+        return result
+
+    return await asyncio.gather(*(run_one(row) for row in rows))
+
+
+def print_stats(results: list[dict], wall_time: float) -> None:
+    """Print timing statistics of a fleet run."""
+    durations = sorted(result["elapsed"] for result in results if result["ok"])
+    failed = sum(1 for result in results if not result["ok"])
+
+    print()
+    print(f"Devices: {len(results)} ({len(durations)} ok, {failed} failed)")
+    print(f"Wall time: {wall_time:.2f}s")
+    if durations:
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+        print(
+            f"Per device: min {durations[0]:.2f}s, mean {statistics.mean(durations):.2f}s, "
+            f"median {statistics.median(durations):.2f}s, p95 {p95:.2f}s, max {durations[-1]:.2f}s"
+        )
+        print(f"Throughput: {len(durations) / wall_time * 60:.1f} devices/min")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Backup or restore a fleet of Shelly Gen2+ devices.")
+    parser.add_argument("command", choices=["backup", "restore"])
+    parser.add_argument("inventory", help="YAML or CSV inventory file")
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_IMPORT_CONCURRENCY,
+        help=f"devices processed at the same time (default: {DEFAULT_IMPORT_CONCURRENCY})",
+    )
+    parser.add_argument("--backup-path", help="override the backup path of every inventory row")
+    parser.add_argument("--git", action="store_true", help="commit each device backup to a git history")
+    parser.add_argument("--config", action="store_true", help="restore: also restore device configuration")
+    parser.add_argument("--data", action="store_true", help="restore: also restore KVS, schedules and webhooks")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress of every device")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command line tool."""
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    if args.git and not git_available():
+        print("git executable not found", file=sys.stderr)
+        return 2
+
+    try:
+        raw_rows = load_inventory(args.inventory)
+    except InventoryError as err:
+        print(err, file=sys.stderr)
+        return 2
+
+    rows = []
+    for index, raw_row in enumerate(raw_rows, start=1):
+        try:
+            rows.append(normalize_row(raw_row))
+        except ValueError as err:
+            print(f"Skipping inventory row {index}: {err}", file=sys.stderr)
+
+    started = time.monotonic()
+    results = asyncio.run(run_fleet(rows, args))
+    print_stats(results, time.monotonic() - started)
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """Config flow for Advanced Shelly integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
@@ -12,6 +13,7 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
 
+from .inventory import InventoryError, load_inventory, normalize_row
 from .shelly_client import ShellyClient
 from .const import (
     DOMAIN,
@@ -21,10 +23,26 @@ from .const import (
     CONF_PASSWORD,
     CONF_BACKUP_PATH,
     CONF_BACKUP_INTERVAL,
+    CONF_CONNECTIVITY_INTERVAL,
+    CONF_STORAGE_BACKEND,
+    CONF_SCRIPT_STATUS_INTERVAL,
+    CONF_DEBUG_LOG,
+    CONF_DEBUG_LOG_ARCHIVE,
+    CONF_INVENTORY_PATH,
     DEFAULT_BACKUP_PATH,
     DEFAULT_BACKUP_INTERVAL,
+    DEFAULT_CONNECTIVITY_INTERVAL,
+    DEFAULT_STORAGE_BACKEND,
+    DEFAULT_SCRIPT_STATUS_INTERVAL,
     DEFAULT_NAME,
     DEFAULT_PORT,
+    MIN_BACKUP_INTERVAL,
+    MAX_BACKUP_INTERVAL,
+    MIN_CONNECTIVITY_INTERVAL,
+    MAX_CONNECTIVITY_INTERVAL,
+    MIN_SCRIPT_STATUS_INTERVAL,
+    MAX_SCRIPT_STATUS_INTERVAL,
+    STORAGE_BACKENDS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -63,9 +81,10 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
                 "model": device_model,
             }
 
-    except aiohttp.ClientError as err:
-        _LOGGER.error(f"Error connecting to Shelly device: {err}")
-        raise CannotConnect(f"Connection error: {err}") from err
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        reason = str(err) or "timed out"
+        _LOGGER.error(f"Error connecting to Shelly device at {host}: {reason}")
+        raise CannotConnect(f"Connection error: {reason}") from err
     except (KeyError, ValueError, TypeError) as err:
         _LOGGER.error(f"Error parsing device response: {err}")
         raise CannotConnect(f"Invalid device response: {err}") from err
@@ -87,7 +106,13 @@ class AdvancedShellyConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_user(
             self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the initial step."""
+        """Let the user add a single device or a fleet."""
+        return self.async_show_menu(step_id="user", menu_options=["device", "fleet"])
+
+    async def async_step_device(
+            self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a single device."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -145,7 +170,69 @@ class AdvancedShellyConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     default=user_input.get(CONF_BACKUP_INTERVAL, DEFAULT_BACKUP_INTERVAL) if user_input else DEFAULT_BACKUP_INTERVAL
                 ): selector.NumberSelector(
                     selector.NumberSelectorConfig(
-                        min=3600, max=604800, step=3600,
+                        min=MIN_BACKUP_INTERVAL, max=MAX_BACKUP_INTERVAL, step=3600,
+                        unit_of_measurement="seconds",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="device", data_schema=data_schema, errors=errors
+        )
+
+    async def async_step_fleet(
+            self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a fleet of devices from an inventory file."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            inventory_path = user_input[CONF_INVENTORY_PATH]
+            try:
+                rows = await self.hass.async_add_executor_job(load_inventory, inventory_path)
+                valid_rows = 0
+                for row in rows:
+                    try:
+                        normalize_row(row)
+                        valid_rows += 1
+                    except ValueError:
+                        pass
+            except InventoryError as err:
+                _LOGGER.error(f"Invalid inventory {inventory_path}: {err}")
+                errors["base"] = "invalid_inventory"
+            else:
+                if not valid_rows:
+                    errors["base"] = "empty_inventory"
+                else:
+                    await self.async_set_unique_id(f"fleet_{inventory_path}")
+                    self._abort_if_unique_id_configured()
+                    return self.async_create_entry(
+                        title=user_input[CONF_NAME],
+                        data=user_input,
+                    )
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_NAME,
+                    default=user_input.get(CONF_NAME, "Shelly fleet") if user_input else "Shelly fleet"
+                ): str,
+                vol.Required(
+                    CONF_INVENTORY_PATH,
+                    default=user_input.get(CONF_INVENTORY_PATH) if user_input else vol.UNDEFINED
+                ): str,
+                vol.Optional(
+                    CONF_BACKUP_PATH,
+                    default=user_input.get(CONF_BACKUP_PATH, DEFAULT_BACKUP_PATH) if user_input else DEFAULT_BACKUP_PATH
+                ): str,
+                vol.Optional(
+                    CONF_BACKUP_INTERVAL,
+                    default=user_input.get(CONF_BACKUP_INTERVAL, DEFAULT_BACKUP_INTERVAL) if user_input else DEFAULT_BACKUP_INTERVAL
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=MIN_BACKUP_INTERVAL, max=MAX_BACKUP_INTERVAL, step=3600,
                         unit_of_measurement="seconds",
                         mode=selector.NumberSelectorMode.BOX,
                     )
@@ -154,7 +241,17 @@ class AdvancedShellyConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
         return self.async_show_form(
-            step_id="user", data_schema=data_schema, errors=errors
+            step_id="fleet", data_schema=data_schema, errors=errors
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for a device already validated by the inventory import."""
+        await self.async_set_unique_id(import_data["device_id"])
+        self._abort_if_unique_id_configured()
+
+        return self.async_create_entry(
+            title=import_data["title"],
+            data=import_data["data"],
         )
 
 
@@ -175,6 +272,11 @@ class AdvancedShellyOptionsFlow(config_entries.OptionsFlow):
             new_data = {**self._config_entry.data}
             new_data[CONF_BACKUP_INTERVAL] = user_input[CONF_BACKUP_INTERVAL]
             new_data[CONF_BACKUP_PATH] = user_input[CONF_BACKUP_PATH]
+            new_data[CONF_CONNECTIVITY_INTERVAL] = user_input[CONF_CONNECTIVITY_INTERVAL]
+            new_data[CONF_STORAGE_BACKEND] = user_input[CONF_STORAGE_BACKEND]
+            new_data[CONF_SCRIPT_STATUS_INTERVAL] = user_input[CONF_SCRIPT_STATUS_INTERVAL]
+            new_data[CONF_DEBUG_LOG] = user_input[CONF_DEBUG_LOG]
+            new_data[CONF_DEBUG_LOG_ARCHIVE] = user_input[CONF_DEBUG_LOG_ARCHIVE]
 
             self.hass.config_entries.async_update_entry(
                 self._config_entry,
@@ -189,6 +291,17 @@ class AdvancedShellyOptionsFlow(config_entries.OptionsFlow):
         current_backup_path = self._config_entry.data.get(
             CONF_BACKUP_PATH, DEFAULT_BACKUP_PATH
         )
+        current_connectivity_interval = self._config_entry.data.get(
+            CONF_CONNECTIVITY_INTERVAL, DEFAULT_CONNECTIVITY_INTERVAL
+        )
+        current_storage_backend = self._config_entry.data.get(
+            CONF_STORAGE_BACKEND, DEFAULT_STORAGE_BACKEND
+        )
+        current_script_status_interval = self._config_entry.data.get(
+            CONF_SCRIPT_STATUS_INTERVAL, DEFAULT_SCRIPT_STATUS_INTERVAL
+        )
+        current_debug_log = self._config_entry.data.get(CONF_DEBUG_LOG, False)
+        current_debug_log_archive = self._config_entry.data.get(CONF_DEBUG_LOG_ARCHIVE, False)
 
         options_schema = vol.Schema(
             {
@@ -197,8 +310,8 @@ class AdvancedShellyOptionsFlow(config_entries.OptionsFlow):
                     default=current_backup_interval
                 ): selector.NumberSelector(
                     selector.NumberSelectorConfig(
-                        min=3600,
-                        max=604800,
+                        min=MIN_BACKUP_INTERVAL,
+                        max=MAX_BACKUP_INTERVAL,
                         step=3600,
                         unit_of_measurement="seconds",
                         mode=selector.NumberSelectorMode.BOX,
@@ -208,6 +321,47 @@ class AdvancedShellyOptionsFlow(config_entries.OptionsFlow):
                     CONF_BACKUP_PATH,
                     default=current_backup_path
                 ): str,
+                vol.Required(
+                    CONF_CONNECTIVITY_INTERVAL,
+                    default=current_connectivity_interval
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=MIN_CONNECTIVITY_INTERVAL,
+                        max=MAX_CONNECTIVITY_INTERVAL,
+                        step=10,
+                        unit_of_measurement="seconds",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Required(
+                    CONF_SCRIPT_STATUS_INTERVAL,
+                    default=current_script_status_interval
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=MIN_SCRIPT_STATUS_INTERVAL,
+                        max=MAX_SCRIPT_STATUS_INTERVAL,
+                        step=10,
+                        unit_of_measurement="seconds",
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Required(
+                    CONF_STORAGE_BACKEND,
+                    default=current_storage_backend
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=STORAGE_BACKENDS,
+                        translation_key=CONF_STORAGE_BACKEND,
+                    )
+                ),
+                vol.Required(
+                    CONF_DEBUG_LOG,
+                    default=current_debug_log
+                ): selector.BooleanSelector(),
+                vol.Required(
+                    CONF_DEBUG_LOG_ARCHIVE,
+                    default=current_debug_log_archive
+                ): selector.BooleanSelector(),
             }
         )
 
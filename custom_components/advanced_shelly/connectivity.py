@@ -0,0 +1,92 @@
+"""Lightweight connectivity poller for the Advanced Shelly integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import CONNECTIVITY_TICK, DEFAULT_PROBE_BATCH
+
+if TYPE_CHECKING:
+    from . import ShellyBackupCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ConnectivityPoller:
+    """Probe all devices for liveness, independent of the backup cycle.
+
+    One poller serves every config entry. Each pass collects the devices whose
+    probe is due and checks them in batches of `batch_size`, spreading the
+    batches over the pass so probes do not go out as a single burst.
+    """
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            tick: float = CONNECTIVITY_TICK,
+            batch_size: int = DEFAULT_PROBE_BATCH,
+    ) -> None:
+        """Initialize the poller."""
+        self.hass = hass
+        self.tick = tick
+        self.batch_size = batch_size
+        self._next_probe: dict[ShellyBackupCoordinator, float] = {}
+        self._cancel_tick = None
+        self._running = False
+
+    def async_add(self, coordinator: ShellyBackupCoordinator) -> None:
+        """Start polling a device, with a random first delay to spread devices out."""
+        delay = random.uniform(0, coordinator.connectivity_interval)
+        self._next_probe[coordinator] = self.hass.loop.time() + delay
+        if self._cancel_tick is None:
+            self._cancel_tick = async_track_time_interval(
+                self.hass, self._async_tick, timedelta(seconds=self.tick)
+            )
+
+    def async_remove(self, coordinator: ShellyBackupCoordinator) -> None:
+        """Stop polling a device, and stop the timer once no device is left."""
+        self._next_probe.pop(coordinator, None)
+        if not self._next_probe and self._cancel_tick is not None:
+            self._cancel_tick()
+            self._cancel_tick = None
+
+    async def _async_tick(self, _now) -> None:
+        """Probe every device that is due."""
+        if self._running:
+            # Previous pass is still busy with slow devices
+            return
+
+        now = self.hass.loop.time()
+        due = [
+            coordinator
+            for coordinator, next_probe in self._next_probe.items()
+            if next_probe <= now
+        ]
+        if not due:
+            return
+
+        for coordinator in due:
+            self._next_probe[coordinator] = now + coordinator.connectivity_interval
+
+        batches = [
+            due[index:index + self.batch_size]
+            for index in range(0, len(due), self.batch_size)
+        ]
+        stagger = self.tick / len(batches)
+
+        self._running = True
+        try:
+            for index, batch in enumerate(batches):
+                if index:
+                    await asyncio.sleep(stagger)
+                await asyncio.gather(
+                    *(coordinator.async_check_connectivity() for coordinator in batch)
+                )
+        finally:
+            self._running = False
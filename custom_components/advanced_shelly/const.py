@@ -9,6 +9,12 @@ CONF_NAME = "name"
 CONF_BACKUP_PATH = "backup_path"
 CONF_BACKUP_INTERVAL = "backup_interval"
 CONF_PASSWORD = "password"
+CONF_CONNECTIVITY_INTERVAL = "connectivity_interval"
+CONF_STORAGE_BACKEND = "storage_backend"
+CONF_SCRIPT_STATUS_INTERVAL = "script_status_interval"
+CONF_DEBUG_LOG = "debug_log"
+CONF_DEBUG_LOG_ARCHIVE = "debug_log_archive"
+CONF_INVENTORY_PATH = "inventory_path"  # only set on fleet entries
 SHELLY_USERNAME = "admin"  # Always 'admin' for Shelly devices
 
 # Defaults
@@ -16,22 +22,131 @@ DEFAULT_BACKUP_PATH = "/config/shelly_backups"
 DEFAULT_BACKUP_INTERVAL = 86400  # 24 hours in seconds
 DEFAULT_NAME = "Shelly Device"
 DEFAULT_PORT = 80
+MIN_BACKUP_INTERVAL = 3600  # 1 hour
+MAX_BACKUP_INTERVAL = 604800  # 7 days
+DEFAULT_CONNECTIVITY_INTERVAL = 60  # seconds between liveness probes
+MIN_CONNECTIVITY_INTERVAL = 10
+MAX_CONNECTIVITY_INTERVAL = 3600
+DEFAULT_SCRIPT_STATUS_INTERVAL = 60  # seconds between script status reads
+MIN_SCRIPT_STATUS_INTERVAL = 10
+MAX_SCRIPT_STATUS_INTERVAL = 3600
+
+# Script debug log stream
+DEBUG_LOG_LINES = 1000  # lines kept in memory per device
+DEBUG_LOG_MAX_LINE = 1024  # longer lines are truncated
+DEBUG_LOG_DIR = "advanced_shelly_debug_logs"  # archive directory in the config dir
+DEBUG_LOG_CHUNK_BYTES = 256 * 1024  # uncompressed size of one archive file
+DEBUG_LOG_MAX_FILES = 20  # archive files kept per device
+DEBUG_LOG_RECONNECT = 5  # first reconnect delay in seconds, doubled on each failure
+DEBUG_LOG_MAX_RECONNECT = 300
+
+# Persisted device info and supported methods
+DEVICE_CACHE_STORAGE_KEY = "advanced_shelly.device_cache"
+DEVICE_CACHE_TTL = 7 * 86400  # seconds until cached methods are read again
+DEVICE_CACHE_SAVE_DELAY = 30  # seconds to batch cache changes into one write
+DEVICE_INFO_MAX_AGE = 300  # seconds a successful read spares the info call before an operation
+
+# Outbound WebSocket endpoint that devices connect to
+WS_ENDPOINT = "/api/advanced_shelly/ws/{token}"
+WS_RPC_SOURCE = "advanced_shelly"  # `src` of requests sent to devices
+WS_HEARTBEAT = 55  # seconds between pings on idle device connections
+WS_TOKEN_STORAGE_KEY = "advanced_shelly.outbound_ws"
+
+# Storage backends
+STORAGE_BACKEND_FILES = "files"  # plain files, overwritten on every run
+STORAGE_BACKEND_GIT = "git"  # plain files plus a local git history
+STORAGE_BACKENDS = [STORAGE_BACKEND_FILES, STORAGE_BACKEND_GIT]
+DEFAULT_STORAGE_BACKEND = STORAGE_BACKEND_FILES
+
+# Progress of restore_all, in the config directory
+RESTORE_CHECKPOINT_FILE = "advanced_shelly_restore.json"
+
+# Backup files besides scripts, in the device backup directory
+DEVICE_CONFIG_FILE = "device_config.json"
+DEVICE_KVS_FILE = "device_kvs.json"
+DEVICE_SCHEDULES_FILE = "device_schedules.json"
+DEVICE_WEBHOOKS_FILE = "device_webhooks.json"
+
+# Device data restored by the restore_data service
+DATA_KVS = "kvs"
+DATA_SCHEDULES = "schedules"
+DATA_WEBHOOKS = "webhooks"
+RESTORABLE_DATA = [DATA_KVS, DATA_SCHEDULES, DATA_WEBHOOKS]
+
+# Job queue: lower values run first
+PRIORITY_INTERACTIVE = 0  # restores requested by a user
+PRIORITY_RECOVERY = 1  # fleet-wide operator jobs, run in background slots ahead of backups
+PRIORITY_MANUAL = 2  # backup_now
+PRIORITY_SCHEDULED = 3  # periodic backups
+DEFAULT_MAX_BACKGROUND_JOBS = 4  # backups running at the same time
+LOOP_LAG_SAMPLE_INTERVAL = 0.5  # seconds between event loop lag samples
+LOOP_LAG_THRESHOLD = 0.1  # lag in seconds that makes backups back off
+LOOP_LAG_HEALTHY = 0.03  # lag in seconds below which backups ramp up again
+
+# Connectivity poller
+CONNECTIVITY_TICK = 5  # seconds between scheduler passes
+DEFAULT_PROBE_BATCH = 10  # devices probed concurrently in one batch
+
+# Bulk import
+DEFAULT_IMPORT_CONCURRENCY = 8  # devices validated in parallel
+MAX_IMPORT_CONCURRENCY = 32
 
 # RPC rate limiting (recent firmware answers 429 to bursts of RPC calls)
 DEFAULT_REQUEST_INTERVAL = 0.5  # minimum seconds between RPC calls
 DEFAULT_MAX_RETRIES = 4  # retries after a 429 before giving up
 DEFAULT_BACKOFF = 1.0  # first backoff in seconds, doubled on each retry
 MAX_BACKOFF = 30.0
+DEFAULT_TIMEOUT = 10.0  # RPC timeout until enough latency samples exist
+MIN_RPC_TIMEOUT = 1.0  # bounds of the latency derived RPC timeout
+MAX_RPC_TIMEOUT = 30.0
+RPC_TIMEOUT_FACTOR = 3.0  # timeout = p99 latency * factor
+LATENCY_WINDOW = 50  # latency samples kept per device and method
+LATENCY_MIN_SAMPLES = 5  # samples needed before the timeout adapts
+RPC_TIMEOUT_RETRIES = 1  # retries of a timed out read
+SCRIPT_PIPELINE_DEPTH = 4  # fetched scripts waiting to be written to disk
+
+# Circuit breaker for unreachable devices
+DEFAULT_FAILURE_THRESHOLD = 3  # consecutive failures before the circuit opens
+DEFAULT_BREAKER_RESET = 30.0  # seconds until the first half-open probe
+MAX_BREAKER_RESET = 3600.0  # cap for the exponentially growing probe delay
+PROBE_TIMEOUT = 3.0  # timeout of the cheap half-open probe
 
 # Services
 SERVICE_BACKUP_NOW = "backup_now"
 SERVICE_RESTORE_SCRIPT = "restore_script"
 SERVICE_RESTORE_CONFIG = "restore_config"
+SERVICE_IMPORT_INVENTORY = "import_inventory"
+SERVICE_RESTORE_DATA = "restore_data"
+SERVICE_CANCEL_BACKUPS = "cancel_backups"
+SERVICE_GET_DEBUG_LOG = "get_debug_log"
+SERVICE_RESTORE_ALL = "restore_all"
+SERVICE_SYNC_SCRIPTS = "sync_scripts"
+SERVICE_CONFIGURE_OUTBOUND_WS = "configure_outbound_ws"
+
+# hass.data keys
+DATA_CONNECTIVITY_POLLER = "connectivity_poller"
+DATA_JOB_QUEUE = "job_queue"
+DATA_RESTORE_JOB = "restore_job"
+DATA_RESTORE_DEFERRED = "restore_deferred"  # listener resuming restore_all for unidentified devices
+DATA_WS_TOKEN = "ws_token"
+DATA_DEVICE_CACHE = "device_cache"
 
 # Attributes
 ATTR_DEVICE_ID = "device_id"
 ATTR_SCRIPT_ID = "script_id"
 ATTR_BACKUP_PATH = "backup_path"
+ATTR_REVISION = "revision"
+ATTR_INCLUDE = "include"
+ATTR_INVENTORY_PATH = "inventory_path"
+ATTR_CONCURRENCY = "concurrency"
+ATTR_LINES = "lines"
+ATTR_INCLUDE_CONFIG = "include_config"
+ATTR_RESTART = "restart"
+ATTR_SOURCE_PATH = "source_path"
+ATTR_DELETE = "delete"
+ATTR_VERIFY = "verify"
+ATTR_ENABLE = "enable"
+ATTR_URL = "url"
 
 # Platforms
 PLATFORMS = ["sensor", "binary_sensor"]
@@ -0,0 +1,254 @@
+"""Script debug log ingestion for the Advanced Shelly integration.
+
+Gen2+ devices stream their debug log (including script `print()` output)
+over the `/debug/log` WebSocket once `debug.websocket.enable` is set in
+the device configuration. Kept free of Home Assistant imports.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import re
+import secrets
+from collections import deque
+from collections.abc import Callable, Coroutine
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+from .const import (
+    DEBUG_LOG_LINES,
+    DEBUG_LOG_MAX_LINE,
+    DEBUG_LOG_CHUNK_BYTES,
+    DEBUG_LOG_MAX_FILES,
+    DEBUG_LOG_RECONNECT,
+    DEBUG_LOG_MAX_RECONNECT,
+    SHELLY_USERNAME,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_DEBUG_LOG_PATH = "/debug/log"
+_CHALLENGE_FIELD = re.compile(r'(\w+)=(?:"([^"]*)"|([^\s,]*))')
+
+
+class DebugLogBuffer:
+    """Keep the last lines of a device debug log, optionally rolling them to disk.
+
+    Memory is bounded by `max_lines` lines of at most `DEBUG_LOG_MAX_LINE`
+    characters plus the pending archive chunk. Full chunks are written as
+    gzip files on the executor, one at a time; while a write is in progress
+    the next chunk keeps growing up to twice `DEBUG_LOG_CHUNK_BYTES` and is
+    dropped beyond that.
+    """
+
+    def __init__(self, max_lines: int = DEBUG_LOG_LINES, archive_dir: Path | None = None) -> None:
+        """Initialize the buffer."""
+        self._lines: deque[str] = deque(maxlen=max_lines)
+        self.archive_dir = archive_dir
+        self._chunk: list[str] = []
+        self._chunk_bytes = 0
+        self._writing = False
+        self.total_lines = 0
+        self.dropped_lines = 0  # lines that could not be archived
+
+    def append(self, line: str) -> None:
+        """Add one log line."""
+        line = line[:DEBUG_LOG_MAX_LINE]
+        self._lines.append(line)
+        self.total_lines += 1
+
+        if self.archive_dir is None:
+            return
+        self._chunk.append(line)
+        self._chunk_bytes += len(line) + 1
+        if self._chunk_bytes < DEBUG_LOG_CHUNK_BYTES:
+            return
+        if not self._writing:
+            self._roll()
+        elif self._chunk_bytes >= 2 * DEBUG_LOG_CHUNK_BYTES:
+            # The disk cannot keep up; drop instead of growing further
+            self.dropped_lines += len(self._chunk)
+            self._chunk, self._chunk_bytes = [], 0
+
+    def lines(self, limit: int | None = None) -> list[str]:
+        """Return the buffered lines, oldest first, optionally only the last `limit`."""
+        if limit is None or limit >= len(self._lines):
+            return list(self._lines)
+        return list(self._lines)[-limit:] if limit > 0 else []
+
+    def _roll(self) -> None:
+        """Hand the current chunk to the executor."""
+        chunk, self._chunk, self._chunk_bytes = self._chunk, [], 0
+        self._writing = True
+        task = asyncio.get_running_loop().run_in_executor(None, self._write_chunk, chunk)
+        task.add_done_callback(self._write_done)
+
+    def _write_done(self, future: asyncio.Future) -> None:
+        """Log a failed archive write and start the next one if a chunk is full."""
+        self._writing = False
+        if (err := future.exception()) is not None:
+            _LOGGER.error(f"Error archiving debug log to {self.archive_dir}: {err}")
+        if self._chunk_bytes >= DEBUG_LOG_CHUNK_BYTES:
+            self._roll()
+
+    def _write_chunk(self, chunk: list[str]) -> None:
+        """Write one compressed archive file and prune old ones (runs in the executor)."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        with gzip.open(self.archive_dir / f"debug_{stamp}.log.gz", "wt", encoding="utf-8") as f:
+            f.write("\n".join(chunk))
+            f.write("\n")
+
+        archives = sorted(self.archive_dir.glob("debug_*.log.gz"))
+        for old_file in archives[:-DEBUG_LOG_MAX_FILES]:
+            old_file.unlink()
+
+
+def format_log_message(message: str) -> str:
+    """Return one log line from a debug log WebSocket message."""
+    try:
+        data = json.loads(message)
+    except ValueError:
+        return message.rstrip("\n")
+    if not isinstance(data, dict):
+        return message.rstrip("\n")
+
+    ts = data.get("ts")
+    text = str(data.get("data", "")).rstrip("\n")
+    if isinstance(ts, (int, float)):
+        stamp = datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds")
+        return f"{stamp} {text}"
+    return text
+
+
+def digest_authorization(password: str, challenge: str) -> str | None:
+    """Return the Authorization header answering a `WWW-Authenticate` digest challenge.
+
+    Returns None if the challenge is not a digest challenge with a realm and nonce.
+    """
+    if not challenge.lower().startswith("digest "):
+        return None
+    fields = {key.lower(): quoted or bare for key, quoted, bare in _CHALLENGE_FIELD.findall(challenge)}
+    if "realm" not in fields or "nonce" not in fields:
+        return None
+
+    algorithm = fields.get("algorithm", "MD5")
+    hash_name = "sha256" if algorithm.upper() == "SHA-256" else "md5"
+
+    def digest(value: str) -> str:
+        return hashlib.new(hash_name, value.encode("utf-8")).hexdigest()
+
+    cnonce = secrets.token_hex(8)
+    nc = "00000001"
+    ha1 = digest(f"{SHELLY_USERNAME}:{fields['realm']}:{password}")
+    ha2 = digest(f"GET:{_DEBUG_LOG_PATH}")
+    response = digest(f"{ha1}:{fields['nonce']}:{nc}:{cnonce}:auth:{ha2}")
+    return (
+        f'Digest username="{SHELLY_USERNAME}", realm="{fields["realm"]}", '
+        f'nonce="{fields["nonce"]}", uri="{_DEBUG_LOG_PATH}", algorithm={algorithm}, '
+        f'response="{response}", qop=auth, nc={nc}, cnonce="{cnonce}"'
+    )
+
+
+def _create_task(coro: Coroutine[Any, Any, Any], name: str) -> asyncio.Task:
+    """Start a named task on the running loop."""
+    return asyncio.create_task(coro, name=name)
+
+
+class DebugLogStream:
+    """Read the debug log WebSocket of one device into a DebugLogBuffer.
+
+    Reconnects with exponential backoff until stopped. Uses the given
+    (shared) session, which is never closed here. A handshake the device
+    rejects with 401 is answered with digest auth when a password is known.
+    The reader task is started with `create_task(coro, name)`, by default
+    `asyncio.create_task`.
+    """
+
+    def __init__(
+            self,
+            session: aiohttp.ClientSession,
+            host: str,
+            port: int,
+            buffer: DebugLogBuffer,
+            password: str | None = None,
+            create_task: Callable[[Coroutine[Any, Any, Any], str], asyncio.Task] | None = None,
+    ) -> None:
+        """Initialize the stream."""
+        self.session = session
+        self.url = f"ws://{host}:{int(port)}{_DEBUG_LOG_PATH}"
+        self.buffer = buffer
+        self.password = password
+        self.connected = False
+        self.last_error: str | None = None
+        self._task: asyncio.Task | None = None
+        self._auth_warned = False
+        self._create_task = create_task or _create_task
+
+    def start(self) -> None:
+        """Start reading in the background."""
+        if self._task is None:
+            self._task = self._create_task(self._run(), f"debug log {self.url}")
+
+    def stop(self) -> None:
+        """Stop reading."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.connected = False
+
+    async def _run(self) -> None:
+        """Keep a connection open and feed every message to the buffer."""
+        delay = DEBUG_LOG_RECONNECT
+        authorization: str | None = None
+        while True:
+            # Every challenge has its own nonce, an answer is used once
+            headers = {"Authorization": authorization} if authorization else None
+            answered_challenge = authorization is not None
+            authorization = None
+            try:
+                async with self.session.ws_connect(self.url, heartbeat=30, headers=headers) as ws:
+                    self.connected = True
+                    self.last_error = None
+                    self._auth_warned = False
+                    delay = DEBUG_LOG_RECONNECT
+                    _LOGGER.debug(f"Connected to {self.url}")
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self.buffer.append(format_log_message(msg.data))
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except aiohttp.WSServerHandshakeError as err:
+                if err.status == 401:
+                    if self.password and not answered_challenge:
+                        challenge = (err.headers or {}).get("WWW-Authenticate", "")
+                        authorization = digest_authorization(self.password, challenge)
+                        if authorization is not None:
+                            continue
+                    self._auth_failed()
+                else:
+                    # 404 until debug.websocket.enable is set on the device
+                    self.last_error = f"Handshake failed ({err.status})"
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as err:
+                self.last_error = str(err) or type(err).__name__
+
+            self.connected = False
+            _LOGGER.debug(f"{self.url} disconnected ({self.last_error}), reconnecting in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, DEBUG_LOG_MAX_RECONNECT)
+
+    def _auth_failed(self) -> None:
+        """Record a rejected handshake, warning once until the next connection."""
+        if self.password:
+            self.last_error = "Authentication failed (401), check the device password"
+        else:
+            self.last_error = "Authentication required (401), no device password configured"
+        if not self._auth_warned:
+            self._auth_warned = True
+            _LOGGER.warning(f"Debug log of {self.url}: {self.last_error}")
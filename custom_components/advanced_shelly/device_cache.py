@@ -0,0 +1,89 @@
+"""Persisted device info and supported RPC methods of every device.
+
+Entries are keyed by host and port, like the per-device registries of the
+client. The method list is only trusted while the device reports the same
+ID and firmware it was read with, and every entry expires after
+`DEVICE_CACHE_TTL`.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DEVICE_CACHE_SAVE_DELAY, DEVICE_CACHE_STORAGE_KEY, DEVICE_CACHE_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device info fields worth keeping; the rest changes nothing we act on
+_INFO_FIELDS = ("id", "name", "model", "gen", "fw_id", "ver", "app", "auth_en")
+
+
+class DeviceCache:
+    """Device info and `Shelly.ListMethods` results, saved to Home Assistant storage."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(hass, 1, DEVICE_CACHE_STORAGE_KEY)
+        self._devices: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load the saved entries, dropping expired ones."""
+        data = await self._store.async_load() or {}
+        now = time.time()
+        self._devices = {
+            key: entry for key, entry in data.items()
+            if now - entry.get("cached_at", 0) < DEVICE_CACHE_TTL
+        }
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached entry of a device, or None if unknown or expired."""
+        entry = self._devices.get(key)
+        if entry is None or time.time() - entry["cached_at"] >= DEVICE_CACHE_TTL:
+            return None
+        return entry
+
+    def update_info(self, key: str, device_info: dict) -> None:
+        """Record freshly read device info, dropping methods of other firmware."""
+        info = {field: device_info.get(field) for field in _INFO_FIELDS}
+        entry = self.get(key)
+        if entry is not None and entry["info"] == info:
+            return
+
+        if entry is not None and entry.get("methods") is not None:
+            old = entry["info"]
+            if (old["id"], old["fw_id"]) == (info["id"], info["fw_id"]):
+                # Only the name or similar changed, the methods still apply
+                entry["info"] = info
+                self._async_schedule_save()
+                return
+            _LOGGER.info(
+                f"Device at {key} changed from {old['id']} ({old['fw_id']}) to "
+                f"{info['id']} ({info['fw_id']}), supported methods are read again"
+            )
+
+        self._devices[key] = {"info": info, "methods": None, "cached_at": time.time()}
+        self._async_schedule_save()
+
+    def methods(self, key: str, device_id: str) -> set[str] | None:
+        """Return the methods a device supports, or None if they are not known."""
+        entry = self.get(key)
+        if entry is None or entry["methods"] is None or entry["info"]["id"] != device_id:
+            return None
+        return set(entry["methods"])
+
+    def set_methods(self, key: str, methods: list[str]) -> None:
+        """Record the methods a device supports, for its cached info."""
+        entry = self.get(key)
+        if entry is None:
+            return
+        entry["methods"] = sorted(methods)
+        entry["cached_at"] = time.time()
+        self._async_schedule_save()
+
+    def _async_schedule_save(self) -> None:
+        """Save soon, batching the changes of many devices into one write."""
+        self._store.async_delay_save(lambda: self._devices, DEVICE_CACHE_SAVE_DELAY)
@@ -0,0 +1,78 @@
+"""Diagnostics support for Advanced Shelly integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_PASSWORD, DATA_JOB_QUEUE
+from .fleet import FleetManager
+from .shelly_client import get_latency_tracker
+
+TO_REDACT = {CONF_PASSWORD}
+DEBUG_LOG_DIAGNOSTIC_LINES = 100
+
+
+async def async_get_config_entry_diagnostics(
+        hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    managed = hass.data[DOMAIN][entry.entry_id]
+    job_queue = hass.data[DOMAIN].get(DATA_JOB_QUEUE)
+
+    diagnostics = {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "job_queue": job_queue.stats if job_queue is not None else None,
+    }
+
+    if isinstance(managed, FleetManager):
+        # Debug log lines of a whole fleet would drown everything else
+        diagnostics["fleet"] = {
+            "devices": len(managed.coordinators),
+            "identified": len(managed.identified),
+        }
+        diagnostics["devices"] = [
+            _device_diagnostics(coordinator, debug_log_lines=0)
+            for coordinator in managed.coordinators
+        ]
+    else:
+        diagnostics["device"] = _device_diagnostics(managed, DEBUG_LOG_DIAGNOSTIC_LINES)
+
+    return diagnostics
+
+
+def _device_diagnostics(coordinator, debug_log_lines: int) -> dict[str, Any]:
+    """Return the diagnostics of one device."""
+    debug_log = None
+    if coordinator.debug_log is not None:
+        debug_log = {
+            "connected": coordinator.debug_log.connected,
+            "last_error": coordinator.debug_log.last_error,
+            "total_lines": coordinator.debug_log.buffer.total_lines,
+            "dropped_lines": coordinator.debug_log.buffer.dropped_lines,
+        }
+        if debug_log_lines:
+            debug_log["lines"] = coordinator.debug_log.buffer.lines(debug_log_lines)
+
+    return {
+        "host": coordinator.host,
+        "device_id": coordinator.device_id,
+        "device_name": coordinator.device_name,
+        "is_available": coordinator.is_available,
+        "last_seen": coordinator.last_seen,
+        "last_backup_time": coordinator.last_backup_time,
+        "backup_count": coordinator.backup_count,
+        "script_count": coordinator.script_count,
+        "last_error": coordinator.last_error,
+        "circuit_state": coordinator.breaker.state,
+        "consecutive_failures": coordinator.breaker.failures,
+        "outbound_ws": coordinator.rpc is not None,
+        "rpc_latency": get_latency_tracker(coordinator.host, coordinator.port).summary(),
+        "debug_log": debug_log,
+        "device_cache": (
+            coordinator.device_cache.get(coordinator.device_key)
+            if coordinator.device_cache is not None else None
+        ),
+    }
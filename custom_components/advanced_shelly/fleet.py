@@ -0,0 +1,139 @@
+"""Fleet config entries of the Advanced Shelly integration.
+
+A fleet entry manages every device of an inventory file. Instead of one
+timer pair per device it runs one backup timer and one script status timer
+for the whole fleet; devices use Home Assistant's shared connection pool and
+one storage directory, and their entities are only created once a device
+has answered and its ID is known.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DEFAULT_PROBE_BATCH, PRIORITY_SCHEDULED
+from .job_queue import JobCancelled
+
+if TYPE_CHECKING:
+    from . import ShellyBackupCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sent with the coordinator of a fleet device whose ID became known
+SIGNAL_NEW_FLEET_DEVICE = "shelly_backup_new_fleet_device_{}"
+
+
+class FleetManager:
+    """Devices of one fleet config entry and the timers they share."""
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            entry_id: str,
+            coordinators: list[ShellyBackupCoordinator],
+            debug_log: bool = False,
+            debug_log_archive: bool = False,
+    ) -> None:
+        """Initialize the fleet."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.coordinators = coordinators
+        self.debug_log = debug_log
+        self.debug_log_archive = debug_log_archive
+        self._cancel_backup = None
+        self._cancel_script_status = None
+        self._script_status_running = False
+
+        for coordinator in coordinators:
+            coordinator.on_identified = self._async_device_identified
+
+    @property
+    def identified(self) -> list[ShellyBackupCoordinator]:
+        """Return the devices whose ID is known."""
+        return [coordinator for coordinator in self.coordinators if coordinator.device_id]
+
+    def async_start(self, backup_interval: int, script_status_interval: int) -> None:
+        """Start the shared backup and script status timers."""
+        self._cancel_backup = async_track_time_interval(
+            self.hass, self._async_backup_tick, timedelta(seconds=backup_interval)
+        )
+        self._cancel_script_status = async_track_time_interval(
+            self.hass, self._async_script_status_tick, timedelta(seconds=script_status_interval)
+        )
+
+    def async_shutdown(self) -> None:
+        """Cancel the shared timers and every device's own timers."""
+        for cancel in (self._cancel_backup, self._cancel_script_status):
+            if cancel:
+                cancel()
+        self._cancel_backup = None
+        self._cancel_script_status = None
+        for coordinator in self.coordinators:
+            coordinator.async_shutdown()
+
+    async def async_backup_all(self, priority: int = PRIORITY_SCHEDULED) -> None:
+        """Back up every device; the job queue bounds how many run at once."""
+        results = await asyncio.gather(
+            *(coordinator.backup_scripts(priority) for coordinator in self.coordinators),
+            return_exceptions=True,
+        )
+        cancelled = 0
+        for coordinator, result in zip(self.coordinators, results):
+            if isinstance(result, JobCancelled):
+                cancelled += 1
+            elif isinstance(result, Exception):
+                _LOGGER.error(f"Backup of {coordinator.device_id or coordinator.host} failed: {result}")
+        if cancelled:
+            _LOGGER.info(f"{cancelled} fleet backups were cancelled")
+
+    async def _async_backup_tick(self, _now) -> None:
+        """Run the periodic backup of the whole fleet."""
+        await self.async_backup_all()
+
+    async def _async_script_status_tick(self, _now) -> None:
+        """Refresh script status of identified devices, a batch at a time."""
+        if self._script_status_running:
+            # Previous pass is still busy with slow devices
+            return
+
+        semaphore = asyncio.Semaphore(DEFAULT_PROBE_BATCH)
+
+        async def refresh(coordinator: ShellyBackupCoordinator) -> None:
+            async with semaphore:
+                try:
+                    await coordinator.async_refresh_script_status()
+                except Exception as err:  # noqa: BLE001 - one device must not stop the pass
+                    _LOGGER.debug(f"Script status refresh for {coordinator.host} failed: {err}")
+
+        self._script_status_running = True
+        try:
+            await asyncio.gather(*(refresh(coordinator) for coordinator in self.identified))
+        finally:
+            self._script_status_running = False
+
+    @callback
+    def _async_device_identified(self, coordinator: ShellyBackupCoordinator) -> None:
+        """Create entities and start per-device extras for a device seen for the first time."""
+        _LOGGER.debug(f"Fleet device {coordinator.host} identified as {coordinator.device_id}")
+        async_dispatcher_send(
+            self.hass, SIGNAL_NEW_FLEET_DEVICE.format(self.entry_id), coordinator
+        )
+        if self.debug_log:
+            coordinator.async_start_debug_log(self.debug_log_archive)
+        self.hass.async_create_background_task(
+            self._async_first_script_status(coordinator),
+            f"advanced_shelly script status {coordinator.device_id}",
+        )
+
+    async def _async_first_script_status(self, coordinator: ShellyBackupCoordinator) -> None:
+        """Read script status right away instead of waiting for the next pass."""
+        try:
+            await coordinator.async_refresh_script_status()
+        except Exception as err:  # noqa: BLE001 - the next pass retries
+            _LOGGER.debug(f"Script status refresh for {coordinator.host} failed: {err}")
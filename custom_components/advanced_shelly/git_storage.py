@@ -0,0 +1,103 @@
+"""Git-backed backup history for the Advanced Shelly integration.
+
+The backup directory doubles as a local git repository: every backup run
+commits the changed files of one device. All methods are blocking and are
+meant to run in an executor.
+"""
+from __future__ import annotations
+
+import logging
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+_LOGGER = logging.getLogger(__name__)
+
+GIT_AUTHOR = ("-c", "user.name=Advanced Shelly", "-c", "user.email=advanced_shelly@localhost")
+
+_STORAGES: dict[Path, GitBackupStorage] = {}
+_STORAGES_LOCK = threading.Lock()
+
+
+class GitStorageError(Exception):
+    """Error to indicate a git command failed."""
+
+
+def git_available() -> bool:
+    """Return True if the git executable can be found."""
+    return shutil.which("git") is not None
+
+
+def get_git_storage(backup_path: str | Path) -> GitBackupStorage:
+    """Return the storage for a backup directory, shared by all devices using it."""
+    path = Path(backup_path).resolve()
+    with _STORAGES_LOCK:
+        if path not in _STORAGES:
+            _STORAGES[path] = GitBackupStorage(path)
+        return _STORAGES[path]
+
+
+def _check_revision(revision: str) -> None:
+    """Refuse revisions git would parse as an option or a path."""
+    if not revision or revision.startswith("-") or ":" in revision:
+        raise GitStorageError(f"Invalid revision {revision!r}")
+
+
+class GitBackupStorage:
+    """Keep a backup directory as a local git repository."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the storage."""
+        self.path = path
+        # One git process at a time per repository, the index is not shareable
+        self._lock = threading.Lock()
+
+    def _git(self, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+        """Run a git command inside the repository."""
+        result = subprocess.run(
+            ["git", *args],
+            cwd=self.path,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if check and result.returncode != 0:
+            raise GitStorageError(
+                f"git {args[0]} failed: {result.stderr.strip() or result.stdout.strip()}"
+            )
+        return result
+
+    def ensure_repo(self) -> None:
+        """Create the repository if the backup directory is not one yet."""
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            if not (self.path / ".git").exists():
+                self._git("init", "--quiet")
+                _LOGGER.info(f"Initialized git backup history in {self.path}")
+
+    def commit(self, device_id: str, message: str) -> str | None:
+        """Commit all changes of one device directory.
+
+        Returns the new commit hash, or None when nothing changed.
+        """
+        with self._lock:
+            self._git("add", "--all", "--", device_id)
+            # Exit code 1 means there are staged changes
+            if self._git("diff", "--cached", "--quiet", "--", device_id, check=False).returncode == 0:
+                return None
+            self._git(*GIT_AUTHOR, "commit", "--quiet", "-m", message, "--", device_id)
+            return self._git("rev-parse", "HEAD").stdout.strip()
+
+    def list_files(self, revision: str, device_id: str) -> list[str]:
+        """Return the file names of a device directory at `revision`."""
+        _check_revision(revision)
+        with self._lock:
+            result = self._git("ls-tree", "--name-only", f"{revision}:{device_id}")
+        return result.stdout.splitlines()
+
+    def read_file(self, revision: str, relative_path: str) -> str:
+        """Return the content of a file at `revision`."""
+        _check_revision(revision)
+        with self._lock:
+            return self._git("show", f"{revision}:{relative_path}").stdout
@@ -0,0 +1,133 @@
+"""Device inventory parsing for the Advanced Shelly integration.
+
+Kept free of Home Assistant imports so the same parser can be reused by
+tooling that runs outside of Home Assistant.
+"""
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Any
+
+from .const import (
+    CONF_HOST,
+    CONF_PORT,
+    CONF_NAME,
+    CONF_PASSWORD,
+    CONF_BACKUP_PATH,
+    CONF_BACKUP_INTERVAL,
+    DEFAULT_BACKUP_PATH,
+    DEFAULT_BACKUP_INTERVAL,
+    DEFAULT_NAME,
+    DEFAULT_PORT,
+    MIN_BACKUP_INTERVAL,
+    MAX_BACKUP_INTERVAL,
+)
+
+INVENTORY_FIELDS = (
+    CONF_HOST,
+    CONF_PORT,
+    CONF_NAME,
+    CONF_PASSWORD,
+    CONF_BACKUP_PATH,
+    CONF_BACKUP_INTERVAL,
+)
+
+
+class InventoryError(ValueError):
+    """Error to indicate the inventory file cannot be read."""
+
+
+def load_inventory(path: str | Path) -> list[dict[str, Any]]:
+    """Read raw device rows from a YAML or CSV inventory file.
+
+    YAML inventories are either a list of mappings or a mapping with a
+    `devices` list. CSV inventories need a header row naming the columns.
+    Rows are returned as-is; use `normalize_row` to validate them.
+    """
+    path = Path(path)
+    if not path.is_file():
+        raise InventoryError(f"Inventory file {path} not found")
+
+    suffix = path.suffix.lower()
+    if suffix in (".yaml", ".yml"):
+        rows = _load_yaml(path)
+    elif suffix == ".csv":
+        rows = _load_csv(path)
+    else:
+        raise InventoryError(f"Unsupported inventory format: {path.suffix or path.name}")
+
+    if not all(isinstance(row, dict) for row in rows):
+        raise InventoryError("Every inventory row must be a mapping of device settings")
+    return rows
+
+
+def _load_yaml(path: Path) -> list[Any]:
+    """Load inventory rows from a YAML file."""
+    import yaml  # Shipped with Home Assistant, only needed for YAML inventories
+
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            content = yaml.safe_load(f)
+        except yaml.YAMLError as err:
+            raise InventoryError(f"Invalid YAML in {path}: {err}") from err
+
+    if content is None:
+        return []
+    if isinstance(content, dict):
+        content = content.get("devices")
+    if not isinstance(content, list):
+        raise InventoryError("YAML inventory must be a list of devices or contain a 'devices' list")
+    return content
+
+
+def _load_csv(path: Path) -> list[dict[str, Any]]:
+    """Load inventory rows from a CSV file with a header row."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or CONF_HOST not in reader.fieldnames:
+            raise InventoryError(f"CSV inventory must have a header row with a '{CONF_HOST}' column")
+        # Drop empty cells so defaults apply the same way as for YAML rows
+        return [
+            {key: value.strip() for key, value in row.items() if key and value and value.strip()}
+            for row in reader
+        ]
+
+
+def normalize_row(row: dict[str, Any]) -> dict[str, Any]:
+    """Validate an inventory row and return config entry data for it.
+
+    Raises ValueError with a human readable message for invalid rows.
+    """
+    unknown = set(row) - set(INVENTORY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    host = str(row.get(CONF_HOST) or "").strip()
+    if not host:
+        raise ValueError(f"Missing '{CONF_HOST}'")
+
+    try:
+        port = int(row.get(CONF_PORT, DEFAULT_PORT))
+        backup_interval = int(row.get(CONF_BACKUP_INTERVAL, DEFAULT_BACKUP_INTERVAL))
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Invalid number: {err}") from err
+
+    if not 1 <= port <= 65535:
+        raise ValueError(f"Port {port} is out of range")
+    if not MIN_BACKUP_INTERVAL <= backup_interval <= MAX_BACKUP_INTERVAL:
+        raise ValueError(
+            f"Backup interval {backup_interval} must be between "
+            f"{MIN_BACKUP_INTERVAL} and {MAX_BACKUP_INTERVAL} seconds"
+        )
+
+    data = {
+        CONF_HOST: host,
+        CONF_PORT: port,
+        CONF_NAME: str(row.get(CONF_NAME) or DEFAULT_NAME),
+        CONF_BACKUP_PATH: str(row.get(CONF_BACKUP_PATH) or DEFAULT_BACKUP_PATH),
+        CONF_BACKUP_INTERVAL: backup_interval,
+    }
+    if row.get(CONF_PASSWORD):
+        data[CONF_PASSWORD] = str(row[CONF_PASSWORD])
+    return data
@@ -0,0 +1,258 @@
+"""Priority job queue for device operations of the Advanced Shelly integration."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Awaitable, Callable, Coroutine
+from typing import Any
+
+from .const import (
+    DEFAULT_MAX_BACKGROUND_JOBS,
+    LOOP_LAG_HEALTHY,
+    LOOP_LAG_SAMPLE_INTERVAL,
+    LOOP_LAG_THRESHOLD,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_MANUAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _create_task(coro: Coroutine[Any, Any, Any], name: str) -> asyncio.Task:
+    """Start a named task on the running loop."""
+    return asyncio.create_task(coro, name=name)
+
+
+class JobCancelled(Exception):
+    """Error to indicate a queued job was cancelled before it started."""
+
+
+class _Job:
+    """One queued operation."""
+
+    __slots__ = ("priority", "seq", "device_key", "factory", "future", "description")
+
+    def __init__(
+            self,
+            priority: int,
+            seq: int,
+            device_key: str,
+            factory: Callable[[], Awaitable[Any]],
+            future: asyncio.Future,
+            description: str,
+    ) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.device_key = device_key
+        self.factory = factory
+        self.future = future
+        self.description = description
+
+    def __lt__(self, other: _Job) -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class JobQueue:
+    """Run device operations by priority, one at a time per device.
+
+    Lower priority values run first; jobs of equal priority run in the order
+    they were queued. Background jobs (anything less urgent than
+    `PRIORITY_INTERACTIVE`) share `max_background` slots, while interactive
+    jobs only wait for their own device, so a restore is never stuck behind
+    a fleet wide backup sweep.
+
+    While background work exists the queue samples event loop lag. When the
+    lag exceeds `LOOP_LAG_THRESHOLD` the background limit is halved (down to
+    zero, which pauses new background jobs); once the loop is healthy again
+    it grows back by one slot per sample.
+
+    Tasks are started with `create_task(coro, name)`, by default
+    `asyncio.create_task`; Home Assistant passes its background task
+    factory so they are tracked and cancelled on shutdown.
+    """
+
+    def __init__(
+            self,
+            max_background: int = DEFAULT_MAX_BACKGROUND_JOBS,
+            create_task: Callable[[Coroutine[Any, Any, Any], str], asyncio.Task] | None = None,
+    ) -> None:
+        """Initialize the queue."""
+        self.max_background = max_background
+        self._create_task = create_task or _create_task
+        self._pending: list[_Job] = []
+        self._busy_devices: set[str] = set()
+        self._running_background = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._seq = itertools.count()
+
+        # Event loop lag feedback
+        self.background_limit = max_background
+        self.last_lag = 0.0
+        self.backoff_seconds = 0.0  # total time spent below max_background
+        self._monitor_task: asyncio.Task | None = None
+
+    @property
+    def pending_count(self) -> int:
+        """Return the number of queued jobs that did not start yet."""
+        return sum(1 for job in self._pending if not job.future.done())
+
+    @property
+    def running_count(self) -> int:
+        """Return the number of running jobs."""
+        return len(self._tasks)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return queue and throttling statistics."""
+        return {
+            "pending": self.pending_count,
+            "running": self.running_count,
+            "background_limit": self.background_limit,
+            "max_background": self.max_background,
+            "last_loop_lag": round(self.last_lag, 3),
+            "backoff_seconds": round(self.backoff_seconds, 1),
+        }
+
+    async def run(
+            self,
+            device_key: str,
+            priority: int,
+            factory: Callable[[], Awaitable[Any]],
+            description: str = "",
+    ) -> Any:
+        """Queue `factory()` for a device and return its result once it ran.
+
+        Raises JobCancelled if the job is cancelled while still queued.
+        """
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(priority, next(self._seq), device_key, factory, future, description)
+        heapq.heappush(self._pending, job)
+        if priority > PRIORITY_INTERACTIVE and self._monitor_task is None:
+            self._monitor_task = self._create_task(
+                self._monitor_loop_lag(), "job queue loop lag monitor"
+            )
+        self._dispatch()
+        return await future
+
+    def cancel(self, device_key: str | None = None, min_priority: int = PRIORITY_MANUAL) -> int:
+        """Cancel queued jobs with at least `min_priority`, optionally for one device.
+
+        Running jobs are left alone. Returns the number of cancelled jobs.
+        """
+        cancelled = 0
+        for job in self._pending:
+            if job.future.done() or job.priority < min_priority:
+                continue
+            if device_key is not None and job.device_key != device_key:
+                continue
+            job.future.set_exception(JobCancelled(f"{job.description or 'Job'} cancelled"))
+            cancelled += 1
+
+        self._pending = [job for job in self._pending if not job.future.done()]
+        heapq.heapify(self._pending)
+        if cancelled:
+            _LOGGER.info(f"Cancelled {cancelled} queued jobs")
+        return cancelled
+
+    def _dispatch(self) -> None:
+        """Start every queued job whose device and slot are free."""
+        waiting = []
+        while self._pending:
+            job = heapq.heappop(self._pending)
+            if job.future.done():
+                # Cancelled while queued, or the caller gave up waiting
+                continue
+
+            background = job.priority > PRIORITY_INTERACTIVE
+            if job.device_key in self._busy_devices or (
+                    background and self._running_background >= self.background_limit
+            ):
+                waiting.append(job)
+                continue
+
+            self._start(job, background)
+
+        for job in waiting:
+            heapq.heappush(self._pending, job)
+
+    def _start(self, job: _Job, background: bool) -> None:
+        """Run a job in its own task."""
+        self._busy_devices.add(job.device_key)
+        if background:
+            self._running_background += 1
+
+        task = self._create_task(
+            self._run_job(job, background), f"job {job.description or job.device_key}"
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, job: _Job, background: bool) -> None:
+        """Run a job and hand its outcome to the waiting caller."""
+        try:
+            result = await job.factory()
+        except asyncio.CancelledError:
+            if not job.future.done():
+                job.future.set_exception(JobCancelled(f"{job.description or 'Job'} cancelled"))
+            raise
+        except Exception as err:  # noqa: BLE001 - the caller gets the exception
+            if not job.future.done():
+                job.future.set_exception(err)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._busy_devices.discard(job.device_key)
+            if background:
+                self._running_background -= 1
+            self._dispatch()
+
+    def _has_background_work(self) -> bool:
+        """Return True while background jobs are running or queued."""
+        return self._running_background > 0 or any(
+            job.priority > PRIORITY_INTERACTIVE and not job.future.done()
+            for job in self._pending
+        )
+
+    async def _monitor_loop_lag(self) -> None:
+        """Adapt the background limit to event loop lag while there is background work."""
+        loop = asyncio.get_running_loop()
+        sweep_backoff = 0.0
+        try:
+            while self._has_background_work():
+                started = loop.time()
+                await asyncio.sleep(LOOP_LAG_SAMPLE_INTERVAL)
+                elapsed = loop.time() - started
+                self.last_lag = max(0.0, elapsed - LOOP_LAG_SAMPLE_INTERVAL)
+
+                if self.background_limit < self.max_background:
+                    self.backoff_seconds += elapsed
+                    sweep_backoff += elapsed
+
+                if self.last_lag > LOOP_LAG_THRESHOLD and self.background_limit > 0:
+                    self.background_limit //= 2
+                    _LOGGER.debug(
+                        f"Event loop lag {self.last_lag * 1000:.0f} ms, "
+                        f"background limit lowered to {self.background_limit}"
+                    )
+                elif self.last_lag < LOOP_LAG_HEALTHY and self.background_limit < self.max_background:
+                    self.background_limit += 1
+                    self._dispatch()
+        finally:
+            self._monitor_task = None
+            self.background_limit = self.max_background
+            if sweep_backoff:
+                _LOGGER.info(
+                    f"Background backups yielded to the event loop for {sweep_backoff:.1f}s"
+                )
+
+    async def async_shutdown(self) -> None:
+        """Cancel every queued and running job."""
+        self.cancel(min_priority=PRIORITY_INTERACTIVE)
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
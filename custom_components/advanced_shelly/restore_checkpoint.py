@@ -0,0 +1,128 @@
+"""Checkpoint of a fleet-wide restore job.
+
+The checkpoint records the outcome of every restored item (device
+configuration or one script) so a job interrupted by a restart continues
+where it stopped. It is a small JSON file rewritten atomically after each
+item. Kept free of Home Assistant imports; file access is blocking.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# Item outcomes; restored and unchanged items are not touched again on resume
+STATUS_RESTORED = "restored"
+STATUS_UNCHANGED = "unchanged"
+STATUS_FAILED = "failed"
+DONE_STATUSES = (STATUS_RESTORED, STATUS_UNCHANGED)
+
+ITEM_CONFIG = "config"
+
+
+def script_item(script_id: int) -> str:
+    """Return the checkpoint item name of a script."""
+    return f"script:{script_id}"
+
+
+class RestoreCheckpoint:
+    """Progress of one restore job, persisted to `path`."""
+
+    def __init__(self, path: str | Path, data: dict[str, Any]) -> None:
+        """Initialize the checkpoint."""
+        self.path = Path(path)
+        self.data = data
+
+    @classmethod
+    def create(
+            cls,
+            path: str | Path,
+            device_ids: list[str],
+            revision: str | None,
+            include_config: bool,
+    ) -> RestoreCheckpoint:
+        """Return a new checkpoint for a job (not saved yet)."""
+        return cls(path, {
+            "started": datetime.now(timezone.utc).isoformat(),
+            "revision": revision,
+            "include_config": include_config,
+            # A job without devices has nothing left to do
+            "finished": not device_ids,
+            "devices": {device_id: {} for device_id in device_ids},
+            "complete": [],
+        })
+
+    @classmethod
+    def load(cls, path: str | Path) -> RestoreCheckpoint | None:
+        """Return the checkpoint stored at `path`, or None if there is none."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(path, json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def dumps(self) -> str:
+        """Return the checkpoint as JSON, to be written with `write`."""
+        return json.dumps(self.data, indent=2)
+
+    def write(self, content: str) -> None:
+        """Write serialized checkpoint content, replacing the previous file atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self.path)
+
+    def save(self) -> None:
+        """Write the checkpoint."""
+        self.write(self.dumps())
+
+    @property
+    def device_ids(self) -> list[str]:
+        """Return the devices of the job."""
+        return list(self.data["devices"])
+
+    @property
+    def revision(self) -> str | None:
+        """Return the git revision restored from, None for the latest files."""
+        return self.data.get("revision")
+
+    @property
+    def include_config(self) -> bool:
+        """Return True if device configuration is restored as well."""
+        return self.data.get("include_config", False)
+
+    @property
+    def finished(self) -> bool:
+        """Return True once every device is complete."""
+        return self.data.get("finished", False)
+
+    def is_device_complete(self, device_id: str) -> bool:
+        """Return True if every item of a device is done."""
+        return device_id in self.data["complete"]
+
+    def complete_device(self, device_id: str) -> None:
+        """Record that every item of a device is done."""
+        if device_id not in self.data["complete"]:
+            self.data["complete"].append(device_id)
+        self.data["finished"] = len(self.data["complete"]) == len(self.data["devices"])
+
+    def is_done(self, device_id: str, item: str) -> bool:
+        """Return True if an item was restored or found unchanged already."""
+        return self.data["devices"][device_id].get(item) in DONE_STATUSES
+
+    def mark(self, device_id: str, item: str, status: str) -> None:
+        """Record the outcome of an item."""
+        self.data["devices"][device_id][item] = status
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        """Return the number of items per outcome for every device."""
+        result = {}
+        for device_id, items in self.data["devices"].items():
+            counts: dict[str, int] = {}
+            for status in items.values():
+                counts[status] = counts.get(status, 0) + 1
+            result[device_id] = counts
+        return result
@@ -0,0 +1,84 @@
+"""Sync device scripts with a local directory of `.js` files.
+
+Each `<name>.js` file maps to the device script named `<name>`. Live code
+is compared by SHA-256 against the file, using the hash stored with the
+last backup when there is one, so an unchanged deploy costs a single
+`Script.List` call. Kept free of Home Assistant imports.
+"""
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from .backup import code_hash
+from .shelly_client import ShellyClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def load_script_sources(source_path: str | Path) -> dict[str, str]:
+    """Return the code of every `.js` file in a directory, keyed by script name."""
+    sources = {}
+    for script_file in sorted(Path(source_path).glob("*.js")):
+        sources[script_file.stem] = script_file.read_text(encoding="utf-8")
+    return sources
+
+
+async def sync_scripts(
+        client: ShellyClient,
+        sources: dict[str, str],
+        stored_hashes: dict[int, str] | None = None,
+        delete: bool = False,
+        verify: bool = False,
+) -> dict[str, list[str]]:
+    """Create, update, enable and (optionally) delete scripts so the device matches `sources`.
+
+    `stored_hashes` maps script IDs to the code hash of their last backup;
+    scripts without one, or every script with `verify`, are compared
+    against the live code instead. Returns the script names per action.
+    """
+    stored_hashes = stored_hashes or {}
+    report: dict[str, list[str]] = {
+        "created": [], "updated": [], "enabled": [], "deleted": [], "unchanged": [],
+    }
+
+    scripts = (await client.get_script_list()).get("scripts", [])
+    by_name = {script.get("name"): script for script in scripts}
+
+    for name, code in sources.items():
+        script = by_name.get(name)
+        if script is None:
+            script_id = (await client.script_create(name))["id"]
+            await client.put_script_code(script_id, code)
+            await client.script_set_config(script_id, {"enable": True})
+            report["created"].append(name)
+            continue
+
+        script_id = script["id"]
+        live_hash = None if verify else stored_hashes.get(script_id)
+        if live_hash is None:
+            live_hash = code_hash((await client.get_script_code(script_id)).get("data", ""))
+
+        changed = False
+        if live_hash != code_hash(code):
+            await client.put_script_code(script_id, code)
+            report["updated"].append(name)
+            changed = True
+        if not script.get("enable", False):
+            await client.script_set_config(script_id, {"enable": True})
+            report["enabled"].append(name)
+            changed = True
+        if not changed:
+            report["unchanged"].append(name)
+
+    if delete:
+        for name, script in by_name.items():
+            if name not in sources:
+                await client.script_delete(script["id"])
+                report["deleted"].append(name)
+
+    _LOGGER.debug(
+        f"Script sync of {client.device_url}: "
+        + ", ".join(f"{len(names)} {action}" for action, names in report.items())
+    )
+    return report
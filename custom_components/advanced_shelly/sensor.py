@@ -3,14 +3,22 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
+from homeassistant.const import UnitOfInformation
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import DOMAIN
-from . import SIGNAL_UPDATE_SHELLY
+from . import SIGNAL_UPDATE_SHELLY, SIGNAL_SCRIPT_STATUS, SIGNAL_NEW_SCRIPTS
+from .fleet import FleetManager, SIGNAL_NEW_FLEET_DEVICE
+
+SCRIPT_MEMORY_SENSORS = {
+    "mem_used": "memory used",
+    "mem_peak": "memory peak",
+    "mem_free": "memory free",
+}
 
 
 async def async_setup_entry(
@@ -19,13 +27,59 @@ async def async_setup_entry(
         async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Shelly backup sensors."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    managed = hass.data[DOMAIN][entry.entry_id]
+    if not isinstance(managed, FleetManager):
+        _async_add_device_entities(hass, entry, managed, async_add_entities)
+        return
+
+    # Fleet devices get their entities once they have been identified
+    @callback
+    def add_device(coordinator) -> None:
+        _async_add_device_entities(hass, entry, coordinator, async_add_entities)
+
+    for coordinator in managed.identified:
+        add_device(coordinator)
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_NEW_FLEET_DEVICE.format(entry.entry_id), add_device)
+    )
 
+
+@callback
+def _async_add_device_entities(
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator,
+        async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add the entities of one device, and script entities as scripts appear."""
     async_add_entities([
         ShellyLastBackupSensor(coordinator, entry),
         ShellyScriptCountSensor(coordinator, entry),
     ])
 
+    known_scripts: set[int] = set()
+
+    @callback
+    def add_script_sensors() -> None:
+        """Add memory sensors for scripts seen for the first time."""
+        new_scripts = set(coordinator.script_status) - known_scripts
+        if not new_scripts:
+            return
+        known_scripts.update(new_scripts)
+        async_add_entities([
+            ShellyScriptMemorySensor(coordinator, entry, script_id, key)
+            for script_id in sorted(new_scripts)
+            for key in SCRIPT_MEMORY_SENSORS
+        ])
+
+    add_script_sensors()
+    if coordinator.device_id:
+        entry.async_on_unload(
+            async_dispatcher_connect(
+                hass, SIGNAL_NEW_SCRIPTS.format(coordinator.device_id), add_script_sensors
+            )
+        )
+
 
 class ShellyLastBackupSensor(SensorEntity):
     """Sensor showing the last backup timestamp."""
@@ -37,7 +91,7 @@ class ShellyLastBackupSensor(SensorEntity):
         """Initialize the sensor."""
         self._coordinator = coordinator
         self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_last_backup"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_last_backup"
         self._attr_name = "Last backup"
 
     async def async_added_to_hass(self) -> None:
@@ -64,8 +118,8 @@ class ShellyLastBackupSensor(SensorEntity):
     def device_info(self):
         """Return device information."""
         return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": f"Shelly Device {self._coordinator.device_name or self._entry.entry_id}",
+            "identifiers": {(DOMAIN, self._coordinator.unique_prefix)},
+            "name": f"Shelly Device {self._coordinator.device_name or self._coordinator.unique_prefix}",
             "manufacturer": "Shelly",
             "model": "Script Backup",
         }
@@ -95,7 +149,7 @@ class ShellyScriptCountSensor(SensorEntity):
         """Initialize the sensor."""
         self._coordinator = coordinator
         self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_script_count"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_script_count"
         self._attr_name = "Script count"
         self._attr_native_unit_of_measurement = "scripts"
 
@@ -123,8 +177,64 @@ class ShellyScriptCountSensor(SensorEntity):
     def device_info(self):
         """Return device information."""
         return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": f"Shelly Device {self._coordinator.device_name or self._entry.entry_id}",
+            "identifiers": {(DOMAIN, self._coordinator.unique_prefix)},
+            "name": f"Shelly Device {self._coordinator.device_name or self._coordinator.unique_prefix}",
+            "manufacturer": "Shelly",
+            "model": "Script Backup",
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self._coordinator.is_available
+
+
+class ShellyScriptMemorySensor(SensorEntity):
+    """Sensor showing the memory usage of one script."""
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:memory"
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+
+    def __init__(self, coordinator, entry: ConfigEntry, script_id: int, key: str) -> None:
+        """Initialize the sensor."""
+        self._coordinator = coordinator
+        self._entry = entry
+        self._script_id = script_id
+        self._key = key
+        script_name = coordinator.script_names.get(script_id, f"script_{script_id}")
+        self._attr_unique_id = f"{coordinator.unique_prefix}_script_{script_id}_{key}"
+        self._attr_name = f"Script {script_name} {SCRIPT_MEMORY_SENSORS[key]}"
+
+    async def async_added_to_hass(self) -> None:
+        """Register callbacks."""
+        @callback
+        def update():
+            self.async_write_ha_state()
+
+        # Status changes, plus device availability changes
+        for signal in (SIGNAL_SCRIPT_STATUS, SIGNAL_UPDATE_SHELLY):
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    signal.format(self._coordinator.device_id),
+                    update
+                )
+            )
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the memory value in bytes."""
+        return self._coordinator.script_status.get(self._script_id, {}).get(self._key)
+
+    @property
+    def device_info(self):
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self._coordinator.unique_prefix)},
+            "name": f"Shelly Device {self._coordinator.device_name or self._coordinator.unique_prefix}",
             "manufacturer": "Shelly",
             "model": "Script Backup",
         }
@@ -132,4 +242,4 @@ class ShellyScriptCountSensor(SensorEntity):
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return self._coordinator.is_available
\ No newline at end of file
+        return self._coordinator.is_available and self._script_id in self._coordinator.script_status
@@ -1,5 +1,7 @@
 import asyncio
 import logging
+import math
+from collections import deque
 
 from aiohttp import DigestAuthMiddleware, ClientSession, ClientTimeout
 
@@ -9,11 +11,121 @@ from .const import (
     DEFAULT_MAX_RETRIES,
     DEFAULT_BACKOFF,
     MAX_BACKOFF,
+    DEFAULT_TIMEOUT,
+    MIN_RPC_TIMEOUT,
+    MAX_RPC_TIMEOUT,
+    RPC_TIMEOUT_FACTOR,
+    LATENCY_WINDOW,
+    LATENCY_MIN_SAMPLES,
+    RPC_TIMEOUT_RETRIES,
 )
+from .ws_rpc import WsRpcConnection
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class HostRateLimiter:
+    """Space RPC calls to one device, shared by every client talking to it.
+
+    Callers reserve the next free slot in arrival order and sleep until it
+    without holding any lock, so waiting (including a 429 backoff) never
+    blocks others from queueing behind.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait for this caller's turn to send a request."""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            slot = max(now, self._next_slot, self._blocked_until)
+            self._next_slot = slot + self.interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            if loop.time() >= self._blocked_until:
+                return
+            # The device asked for a backoff while we waited; queue up behind it
+
+    def defer(self, delay: float) -> None:
+        """Hold back every request for `delay` seconds after a 429."""
+        resume_at = asyncio.get_running_loop().time() + delay
+        self._blocked_until = max(self._blocked_until, resume_at)
+
+
+class LatencyTracker:
+    """Rolling RPC latency of one device, per method, and the timeouts derived from it.
+
+    The timeout of a method is its p99 latency times `RPC_TIMEOUT_FACTOR`,
+    clamped to `MIN_RPC_TIMEOUT`..`MAX_RPC_TIMEOUT`, so a hung call on a
+    healthy device fails in about a second while slow responses over weak
+    Wi-Fi get the time they need.
+    """
+
+    def __init__(self) -> None:
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, path: str, seconds: float) -> None:
+        """Add the duration of one call."""
+        if path not in self._samples:
+            self._samples[path] = deque(maxlen=LATENCY_WINDOW)
+        self._samples[path].append(seconds)
+
+    def p99(self, path: str) -> float | None:
+        """Return the p99 latency of a method, or None without enough samples."""
+        samples = self._samples.get(path)
+        if not samples or len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[math.ceil(len(ordered) * 0.99) - 1]
+
+    def timeout_for(self, path: str, default: float) -> float:
+        """Return the timeout of the next call of a method."""
+        p99 = self.p99(path)
+        if p99 is None:
+            return default
+        return min(MAX_RPC_TIMEOUT, max(MIN_RPC_TIMEOUT, p99 * RPC_TIMEOUT_FACTOR))
+
+    def summary(self, default: float = DEFAULT_TIMEOUT) -> dict[str, dict]:
+        """Return sample count, p99 and current timeout of every method."""
+        return {
+            path: {
+                "samples": len(samples),
+                "p99": self.p99(path),
+                "timeout": self.timeout_for(path, default),
+            }
+            for path, samples in self._samples.items()
+        }
+
+
+_RATE_LIMITERS: dict[str, HostRateLimiter] = {}
+_LATENCY_TRACKERS: dict[str, LatencyTracker] = {}
+
+
+def _device_key(host: str, port: int) -> str:
+    """Return the registry key of a device."""
+    return f"{host.lower()}:{int(port)}"
+
+
+def get_rate_limiter(host: str, port: int, interval: float = DEFAULT_REQUEST_INTERVAL) -> HostRateLimiter:
+    """Return the process-wide rate limiter of a device, keyed by host:port."""
+    key = _device_key(host, port)
+    if key not in _RATE_LIMITERS:
+        _RATE_LIMITERS[key] = HostRateLimiter(interval)
+    return _RATE_LIMITERS[key]
+
+
+def get_latency_tracker(host: str, port: int) -> LatencyTracker:
+    """Return the process-wide latency tracker of a device, keyed by host:port."""
+    key = _device_key(host, port)
+    if key not in _LATENCY_TRACKERS:
+        _LATENCY_TRACKERS[key] = LatencyTracker()
+    return _LATENCY_TRACKERS[key]
+
+
 class ShellyClient:
     def __init__(
             self,
@@ -22,35 +134,38 @@ class ShellyClient:
             password: str | None,
             request_interval: float = DEFAULT_REQUEST_INTERVAL,
             max_retries: int = DEFAULT_MAX_RETRIES,
+            timeout: float = DEFAULT_TIMEOUT,
+            session: ClientSession | None = None,
+            rpc: WsRpcConnection | None = None,
     ):
         self.device_url = f"http://{device_host}:{int(device_port)}"
+        self.password = password
         self.middlewares = ()
         if password:
             digest_auth = DigestAuthMiddleware(login=SHELLY_USERNAME, password=password)
             self.middlewares = (digest_auth,)
-        self.session = None
+        # A shared session (connection pool) is borrowed and never closed here
+        self.session = session
+        # Calls go over the device's outbound WebSocket instead of HTTP when set
+        self.rpc = rpc
+        self._owns_session = session is None and rpc is None
         self.request_interval = request_interval
         self.max_retries = max_retries
-        self._lock = asyncio.Lock()
-        self._next_request_at = 0.0
+        # Used until the device answered a method often enough to adapt
+        self.timeout = timeout
+        # Shared with every other client of the same device
+        self._limiter = get_rate_limiter(device_host, device_port, request_interval)
+        self._latency = get_latency_tracker(device_host, device_port)
 
     async def __aenter__(self):
-
-        self.session = ClientSession(middlewares=self.middlewares, timeout=ClientTimeout(total=10))
+        if self._owns_session:
+            self.session = ClientSession()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self._owns_session and self.session:
             await self.session.close()
 
-    async def _throttle(self) -> None:
-        """Keep at least `request_interval` seconds between RPC calls."""
-        loop = asyncio.get_running_loop()
-        wait = self._next_request_at - loop.time()
-        if wait > 0:
-            await asyncio.sleep(wait)
-        self._next_request_at = loop.time() + self.request_interval
-
     @staticmethod
     def _retry_after(value: str | None) -> float | None:
         """Parse a Retry-After header holding a delay in seconds."""
@@ -62,37 +177,97 @@ class ShellyClient:
             # HTTP-date form is not used by Shelly devices; fall back to backoff
             return None
 
-    async def _request(self, method: str, path: str, **kwargs):
-        """Perform a throttled RPC call, retrying when the device answers 429."""
+    async def _request(self, method: str, path: str, timeout: float | None = None, **kwargs):
+        """Perform a throttled RPC call, retrying when the device answers 429.
+
+        The timeout of reads (GET) adapts to the latency observed for this
+        device and method. A read that times out with an adaptive timeout
+        shorter than the client timeout is retried once with more time, at
+        most the client timeout. Writes are not retried, so they always get
+        the full client timeout. `timeout` overrides either for this call only.
+        """
+        if self.rpc is not None:
+            return await self._rpc_request(method, path, timeout, **kwargs)
+
         url = f"{self.device_url}{path}"
+        loop = asyncio.get_running_loop()
         backoff = DEFAULT_BACKOFF
+        timeout_retries = RPC_TIMEOUT_RETRIES if method == 'GET' and timeout is None else 0
+        retry_timeout = 0.0
+        attempt = 0
 
-        for attempt in range(self.max_retries + 1):
-            async with self._lock:
-                await self._throttle()
-                async with self.session.request(method, url, **kwargs) as resp:
+        while True:
+            call_timeout = timeout or self._call_timeout(method, path, retry_timeout)
+            await self._limiter.acquire()
+            started = loop.time()
+            try:
+                async with self.session.request(
+                        method,
+                        url,
+                        middlewares=self.middlewares,
+                        timeout=ClientTimeout(total=call_timeout),
+                        **kwargs,
+                ) as resp:
                     if resp.status != 429 or attempt == self.max_retries:
                         resp.raise_for_status()
-                        return await resp.json()
+                        result = await resp.json()
+                        self._latency.record(path, loop.time() - started)
+                        return result
 
                     delay = self._retry_after(resp.headers.get("Retry-After"))
                     if delay is None:
                         delay = backoff
                         backoff = min(backoff * 2, MAX_BACKOFF)
-                    # Do not let the next call start before the backoff elapsed
-                    self._next_request_at = asyncio.get_running_loop().time() + delay
+            except asyncio.TimeoutError:
+                # Not a latency sample: it would only echo the timeout back.
+                # Only a shortened timeout is worth another try.
+                if timeout_retries == 0 or call_timeout >= self.timeout:
+                    raise
+                timeout_retries -= 1
+                # At least twice the time, but never more than the client timeout
+                retry_timeout = min(call_timeout * 2, self.timeout)
+                _LOGGER.debug(f"{url} timed out after {call_timeout:.1f}s, retrying")
+                continue
 
+            # No call to this device, from any client, starts before the backoff
+            # elapsed; the retry waits for its turn like everyone else
+            self._limiter.defer(delay)
+            attempt += 1
             _LOGGER.debug(
                 f"{url} rate limited (429), retrying in {delay:.1f}s "
-                f"(attempt {attempt + 1}/{self.max_retries})"
+                f"(attempt {attempt}/{self.max_retries})"
             )
-            await asyncio.sleep(delay)
+
+    def _call_timeout(self, method: str, path: str, minimum: float = 0.0) -> float:
+        """Return the timeout of a call: adaptive for reads, the full timeout for writes."""
+        if method != 'GET':
+            return self.timeout
+        return max(self._latency.timeout_for(path, self.timeout), minimum)
+
+    async def _rpc_request(self, method: str, path: str, timeout: float | None = None, **kwargs):
+        """Perform a throttled RPC call over the outbound WebSocket."""
+        loop = asyncio.get_running_loop()
+        call_timeout = timeout or self._call_timeout(method, path)
+        await self._limiter.acquire()
+        started = loop.time()
+        result = await self.rpc.call(
+            path.removeprefix('/rpc/'),
+            kwargs.get('json') or kwargs.get('params'),
+            call_timeout,
+            self.password,
+        )
+        self._latency.record(path, loop.time() - started)
+        return result
 
     async def get_status(self):
         return await self._request('GET', '/rpc/Shelly.GetStatus')
 
-    async def get_device_info(self):
-        return await self._request('GET', '/rpc/Shelly.GetDeviceInfo')
+    async def get_device_info(self, timeout: float | None = None):
+        return await self._request('GET', '/rpc/Shelly.GetDeviceInfo', timeout=timeout)
+
+    async def list_methods(self):
+        """List the RPC methods the device supports."""
+        return await self._request('GET', '/rpc/Shelly.ListMethods')
 
     async def get_script_list(self):
         return await self._request('GET', '/rpc/Script.List')
@@ -104,6 +279,22 @@ class ShellyClient:
         payload = {'id': script_id, 'code': code}
         return await self._request('POST', '/rpc/Script.PutCode', json=payload)
 
+    async def script_create(self, name: str):
+        """Create an empty script, returning its ID."""
+        return await self._request('POST', '/rpc/Script.Create', json={'name': name})
+
+    async def script_set_config(self, script_id: int, config: dict):
+        """Change script settings such as `enable` (start on boot)."""
+        payload = {'id': script_id, 'config': config}
+        return await self._request('POST', '/rpc/Script.SetConfig', json=payload)
+
+    async def script_delete(self, script_id: int):
+        return await self._request('POST', '/rpc/Script.Delete', json={'id': script_id})
+
+    async def ws_set_config(self, config: dict):
+        """Configure the outbound WebSocket; takes effect after a reboot."""
+        return await self._request('POST', '/rpc/Ws.SetConfig', json={'config': config})
+
     async def get_config(self):
         """Get full device configuration."""
         return await self._request('GET', '/rpc/Shelly.GetConfig')
@@ -111,3 +302,46 @@ class ShellyClient:
     async def set_config(self, config: dict):
         """Set device configuration."""
         return await self._request('POST', '/rpc/Shelly.SetConfig', json=config)
+
+    async def kvs_get_many(self, offset: int = 0):
+        """Get one page of KVS entries starting at `offset`."""
+        return await self._request('GET', '/rpc/KVS.GetMany', params={'offset': offset})
+
+    async def get_all_kvs(self) -> dict:
+        """Get all KVS entries as a key to value mapping, following pagination."""
+        values = {}
+        offset = 0
+        while True:
+            response = await self.kvs_get_many(offset)
+            items = response.get('items', [])
+            # Older firmware returns a mapping of key to {value, etag}
+            if isinstance(items, dict):
+                items = [{'key': key, **item} for key, item in items.items()]
+            for item in items:
+                values[item['key']] = item.get('value')
+
+            offset += len(items)
+            if not items or offset >= response.get('total', offset):
+                return values
+
+    async def kvs_set(self, key: str, value):
+        payload = {'key': key, 'value': value}
+        return await self._request('POST', '/rpc/KVS.Set', json=payload)
+
+    async def schedule_list(self):
+        return await self._request('GET', '/rpc/Schedule.List')
+
+    async def schedule_create(self, job: dict):
+        return await self._request('POST', '/rpc/Schedule.Create', json=job)
+
+    async def schedule_delete_all(self):
+        return await self._request('POST', '/rpc/Schedule.DeleteAll')
+
+    async def webhook_list(self):
+        return await self._request('GET', '/rpc/Webhook.List')
+
+    async def webhook_create(self, hook: dict):
+        return await self._request('POST', '/rpc/Webhook.Create', json=hook)
+
+    async def webhook_delete_all(self):
+        return await self._request('POST', '/rpc/Webhook.DeleteAll')
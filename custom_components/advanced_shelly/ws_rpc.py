@@ -0,0 +1,147 @@
+"""JSON-RPC over a device's outbound WebSocket.
+
+Gen2+ devices can open a WebSocket to a server of their configuration
+(`Ws.SetConfig`) and keep it open. Requests are sent down that connection
+as JSON-RPC frames and answered on it, next to the status notifications
+the device pushes. Kept free of Home Assistant imports.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import secrets
+from collections.abc import Awaitable, Callable
+
+import aiohttp
+
+from .const import DEFAULT_TIMEOUT, SHELLY_USERNAME, WS_RPC_SOURCE
+
+_LOGGER = logging.getLogger(__name__)
+
+# JSON-RPC error code of a request that needs authentication
+RPC_ERROR_UNAUTHORIZED = 401
+
+
+class RpcError(aiohttp.ClientError):
+    """Error to indicate the device answered a request with a JSON-RPC error."""
+
+    def __init__(self, code: int, message: str) -> None:
+        """Initialize the error."""
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+
+
+def _sha256(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def digest_auth(password: str, challenge: dict) -> dict:
+    """Return the `auth` object answering a device's digest challenge."""
+    cnonce = secrets.randbelow(2**31)
+    ha1 = _sha256(f"{SHELLY_USERNAME}:{challenge['realm']}:{password}")
+    ha2 = _sha256("dummy_method:dummy_uri")
+    nc = challenge.get("nc", 1)
+    return {
+        "realm": challenge["realm"],
+        "username": SHELLY_USERNAME,
+        "nonce": challenge["nonce"],
+        "cnonce": cnonce,
+        "response": _sha256(f"{ha1}:{challenge['nonce']}:{nc}:{cnonce}:auth:{ha2}"),
+        "algorithm": "SHA-256",
+    }
+
+
+class WsRpcConnection:
+    """Requests to one device over its open outbound WebSocket.
+
+    `send` writes one text frame. Every frame received from the device is
+    handed to `handle_message`, which resolves the matching request.
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable[None]], device_id: str) -> None:
+        """Initialize the connection."""
+        self._send = send
+        self.device_id = device_id
+        self.closed = False
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+
+    async def call(
+            self,
+            method: str,
+            params: dict | None = None,
+            timeout: float = DEFAULT_TIMEOUT,
+            password: str | None = None,
+    ) -> dict:
+        """Send one request and return its result.
+
+        A request the device rejects as unauthorized is repeated once with
+        an answer to its digest challenge when a password is known.
+        """
+        try:
+            return await self._call(method, params, timeout)
+        except RpcError as err:
+            if err.code != RPC_ERROR_UNAUTHORIZED or not password:
+                raise
+            try:
+                auth = digest_auth(password, json.loads(err.message))
+            except (ValueError, KeyError):
+                raise err from None
+        return await self._call(method, params, timeout, auth)
+
+    async def _call(
+            self,
+            method: str,
+            params: dict | None,
+            timeout: float,
+            auth: dict | None = None,
+    ) -> dict:
+        """Send one frame and wait for the response with the same ID."""
+        if self.closed:
+            raise aiohttp.ClientConnectionError(f"Connection of {self.device_id} is closed")
+
+        request_id = next(self._ids)
+        frame = {"id": request_id, "src": WS_RPC_SOURCE, "method": method}
+        if params:
+            frame["params"] = params
+        if auth is not None:
+            frame["auth"] = auth
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send(json.dumps(frame))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def handle_message(self, data: dict) -> bool:
+        """Resolve the request a frame answers; return False for notifications."""
+        future = self._pending.get(data.get("id"))
+        if future is None:
+            if "id" in data:
+                _LOGGER.debug(f"Late response {data['id']} from {self.device_id} ignored")
+            return "id" in data
+        if future.done():
+            return True
+
+        if "error" in data:
+            error = data["error"]
+            future.set_exception(RpcError(error.get("code", 0), error.get("message", "")))
+        else:
+            future.set_result(data.get("result") or {})
+        return True
+
+    def close(self) -> None:
+        """Fail every request still waiting for a response."""
+        self.closed = True
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(
+                    aiohttp.ClientConnectionError(f"Connection of {self.device_id} was closed")
+                )
+        self._pending.clear()
@@ -0,0 +1,87 @@
+"""Endpoint for the outbound WebSockets of Shelly devices.
+
+Devices configured with `Ws.SetConfig` connect to Home Assistant instead
+of being polled, which also reaches devices behind NAT. The URL holds a
+random token because Home Assistant authentication cannot be used by the
+device; the connection is bound to the coordinator named by the `src` of
+its first frame.
+"""
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from aiohttp import WSMsgType, web
+from homeassistant.components.http import HomeAssistantView
+
+from .const import WS_ENDPOINT, WS_HEARTBEAT
+from .ws_rpc import WsRpcConnection
+
+if TYPE_CHECKING:
+    from . import ShellyBackupCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ShellyOutboundView(HomeAssistantView):
+    """Accept device connections and run JSON-RPC over them."""
+
+    url = WS_ENDPOINT
+    name = "api:advanced_shelly:ws"
+    requires_auth = False
+
+    def __init__(
+            self,
+            token: str,
+            find_coordinator: Callable[[str], ShellyBackupCoordinator | None],
+    ) -> None:
+        """Initialize the view."""
+        self.token = token
+        self.find_coordinator = find_coordinator
+
+    async def get(self, request: web.Request, token: str) -> web.StreamResponse:
+        """Serve one device connection until it closes."""
+        if not hmac.compare_digest(token, self.token):
+            return web.Response(status=404)
+
+        ws = web.WebSocketResponse(heartbeat=WS_HEARTBEAT)
+        await ws.prepare(request)
+
+        connection: WsRpcConnection | None = None
+        coordinator: ShellyBackupCoordinator | None = None
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    data = json.loads(msg.data)
+                except ValueError:
+                    continue
+                if not isinstance(data, dict):
+                    continue
+
+                if connection is None:
+                    coordinator = self.find_coordinator(data.get("src"))
+                    if coordinator is None:
+                        _LOGGER.warning(
+                            f"Outbound WebSocket from unknown device {data.get('src')} "
+                            f"({request.remote}) closed"
+                        )
+                        break
+                    connection = WsRpcConnection(ws.send_str, data["src"])
+                    coordinator.async_attach_rpc(connection)
+                elif data.get("src") != connection.device_id:
+                    continue
+
+                if not connection.handle_message(data):
+                    coordinator.async_handle_notification(data)
+        finally:
+            if connection is not None:
+                connection.close()
+                coordinator.async_detach_rpc(connection)
+            await ws.close()
+
+        return ws
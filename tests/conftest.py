@@ -0,0 +1,65 @@
+"""Shared fixtures for the Advanced Shelly tests.
+
+The modules under test do not need Home Assistant. The integration
+directory is registered as the `advanced_shelly` package without running
+its Home Assistant specific `__init__`, the same way `cli.py` does.
+"""
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+_INTEGRATION_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "advanced_shelly"
+
+if "advanced_shelly" not in sys.modules:
+    _spec = importlib.machinery.ModuleSpec("advanced_shelly", None, is_package=True)
+    _package = importlib.util.module_from_spec(_spec)
+    _package.__path__ = [str(_INTEGRATION_DIR)]
+    sys.modules["advanced_shelly"] = _package
+
+
+class FakeClient:
+    """Script RPC calls against an in-memory device."""
+
+    device_url = "http://fake"
+
+    def __init__(self, scripts):
+        self.scripts = {script["id"]: dict(script) for script in scripts}
+        self.calls = []
+
+    async def get_script_list(self):
+        self.calls.append("Script.List")
+        return {"scripts": [
+            {key: value for key, value in script.items() if key != "code"}
+            for script in self.scripts.values()
+        ]}
+
+    async def get_script_code(self, script_id):
+        self.calls.append("Script.GetCode")
+        return {"data": self.scripts[script_id]["code"]}
+
+    async def put_script_code(self, script_id, code):
+        self.calls.append("Script.PutCode")
+        self.scripts[script_id]["code"] = code
+
+    async def script_create(self, name):
+        self.calls.append("Script.Create")
+        script_id = max(self.scripts, default=0) + 1
+        self.scripts[script_id] = {"id": script_id, "name": name, "enable": False, "code": ""}
+        return {"id": script_id}
+
+    async def script_set_config(self, script_id, config):
+        self.calls.append("Script.SetConfig")
+        self.scripts[script_id].update(config)
+
+    async def script_delete(self, script_id):
+        self.calls.append("Script.Delete")
+        del self.scripts[script_id]
+
+
+@pytest.fixture
+def fake_client():
+    """Return the class of an in-memory device for script RPC calls."""
+    return FakeClient
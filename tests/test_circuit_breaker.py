@@ -0,0 +1,90 @@
+"""Tests for the per-device circuit breaker."""
+import pytest
+
+from advanced_shelly import circuit_breaker
+from advanced_shelly.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the monotonic clock of the breaker with a settable one."""
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_in == pytest.approx(30)
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_single_half_open_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.state == STATE_HALF_OPEN
+
+    assert breaker.allow_request()
+    # Everyone else keeps failing fast while the probe runs
+    assert not breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+
+
+def test_failed_probe_doubles_delay(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, max_reset_timeout=100)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.retry_in == pytest.approx(60)
+
+    clock[0] += 60
+    assert breaker.allow_request()
+    breaker.record_failure()
+    # Capped at max_reset_timeout
+    assert breaker.retry_in == pytest.approx(100)
+
+
+def test_successful_probe_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.retry_in == 0.0
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+
+def test_probe_outcome_always_frees_next_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    clock[0] += 60
+    # The failed probe released its slot, the next one may run
+    assert breaker.allow_request()
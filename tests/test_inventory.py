@@ -0,0 +1,102 @@
+"""Tests for YAML and CSV inventory parsing."""
+import pytest
+
+from advanced_shelly.const import DEFAULT_BACKUP_INTERVAL, DEFAULT_BACKUP_PATH, DEFAULT_NAME
+from advanced_shelly.inventory import InventoryError, load_inventory, normalize_row
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_yaml_list(tmp_path):
+    path = _write(tmp_path, "devices.yaml", """
+- host: 192.168.1.10
+- host: 192.168.1.11
+  port: 8080
+  name: Boiler
+  password: secret
+""")
+    assert load_inventory(path) == [
+        {"host": "192.168.1.10"},
+        {"host": "192.168.1.11", "port": 8080, "name": "Boiler", "password": "secret"},
+    ]
+
+
+def test_yaml_devices_mapping(tmp_path):
+    path = _write(tmp_path, "devices.yml", "devices:\n  - host: 192.168.1.10\n")
+    assert load_inventory(path) == [{"host": "192.168.1.10"}]
+
+
+def test_empty_yaml(tmp_path):
+    assert load_inventory(_write(tmp_path, "devices.yaml", "")) == []
+
+
+@pytest.mark.parametrize("content", [
+    "host: 192.168.1.10\n",
+    "- 192.168.1.10\n",
+    "- host: [unclosed\n",
+])
+def test_bad_yaml(tmp_path, content):
+    with pytest.raises(InventoryError):
+        load_inventory(_write(tmp_path, "devices.yaml", content))
+
+
+def test_csv_with_header(tmp_path):
+    path = _write(tmp_path, "devices.csv", (
+        "host,port,name,password\n"
+        "192.168.1.10,,,\n"
+        " 192.168.1.11 ,8080,Boiler,secret\n"
+    ))
+    assert load_inventory(path) == [
+        {"host": "192.168.1.10"},
+        {"host": "192.168.1.11", "port": "8080", "name": "Boiler", "password": "secret"},
+    ]
+
+
+def test_csv_without_host_column(tmp_path):
+    path = _write(tmp_path, "devices.csv", "address,port\n192.168.1.10,80\n")
+    with pytest.raises(InventoryError, match="'host' column"):
+        load_inventory(path)
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(InventoryError, match="not found"):
+        load_inventory(tmp_path / "devices.yaml")
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(InventoryError, match="Unsupported inventory format"):
+        load_inventory(_write(tmp_path, "devices.json", "[]"))
+
+
+def test_normalize_applies_defaults():
+    assert normalize_row({"host": " 192.168.1.10 "}) == {
+        "host": "192.168.1.10",
+        "port": 80,
+        "name": DEFAULT_NAME,
+        "backup_path": DEFAULT_BACKUP_PATH,
+        "backup_interval": DEFAULT_BACKUP_INTERVAL,
+    }
+
+
+def test_normalize_converts_csv_strings():
+    data = normalize_row({"host": "h", "port": "8080", "backup_interval": "3600", "password": "pw"})
+    assert data["port"] == 8080
+    assert data["backup_interval"] == 3600
+    assert data["password"] == "pw"
+
+
+@pytest.mark.parametrize(("row", "message"), [
+    ({"port": 80}, "Missing 'host'"),
+    ({"host": "  "}, "Missing 'host'"),
+    ({"host": "h", "ip": "x"}, "Unknown fields: ip"),
+    ({"host": "h", "port": "eighty"}, "Invalid number"),
+    ({"host": "h", "port": 70000}, "out of range"),
+    ({"host": "h", "backup_interval": 60}, "must be between"),
+])
+def test_normalize_rejects_bad_rows(row, message):
+    with pytest.raises(ValueError, match=message):
+        normalize_row(row)
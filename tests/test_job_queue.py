@@ -0,0 +1,159 @@
+"""Tests for the priority job queue."""
+import asyncio
+
+import pytest
+
+from advanced_shelly.const import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_MANUAL,
+    PRIORITY_RECOVERY,
+    PRIORITY_SCHEDULED,
+)
+from advanced_shelly.job_queue import JobCancelled, JobQueue
+
+
+def _job(log, name, gate=None):
+    """Return a job factory that logs its name, waiting for `gate` first."""
+    async def factory():
+        if gate is not None:
+            await gate.wait()
+        log.append(name)
+        return name
+    return factory
+
+
+async def _settle():
+    """Let every ready task run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_background_jobs_run_by_priority():
+    async def scenario():
+        queue = JobQueue(max_background=1)
+        log = []
+        gate = asyncio.Event()
+        blocker = asyncio.ensure_future(queue.run("a", PRIORITY_SCHEDULED, _job(log, "a", gate)))
+        await _settle()
+        jobs = [
+            asyncio.ensure_future(queue.run("b", PRIORITY_SCHEDULED, _job(log, "b"))),
+            asyncio.ensure_future(queue.run("c", PRIORITY_MANUAL, _job(log, "c"))),
+            asyncio.ensure_future(queue.run("d", PRIORITY_RECOVERY, _job(log, "d"))),
+        ]
+        await _settle()
+        assert queue.pending_count == 3
+
+        gate.set()
+        await asyncio.gather(blocker, *jobs)
+        await queue.async_shutdown()
+        return log
+
+    assert asyncio.run(scenario()) == ["a", "d", "c", "b"]
+
+
+def test_interactive_jobs_skip_background_limit():
+    async def scenario():
+        queue = JobQueue(max_background=0)
+        result = await queue.run("a", PRIORITY_INTERACTIVE, _job([], "restore"))
+        await queue.async_shutdown()
+        return result
+
+    assert asyncio.run(scenario()) == "restore"
+
+
+def test_one_job_per_device():
+    async def scenario():
+        queue = JobQueue()
+        log = []
+        gate = asyncio.Event()
+        first = asyncio.ensure_future(queue.run("a", PRIORITY_INTERACTIVE, _job(log, "first", gate)))
+        second = asyncio.ensure_future(queue.run("a", PRIORITY_INTERACTIVE, _job(log, "second")))
+        other = asyncio.ensure_future(queue.run("b", PRIORITY_INTERACTIVE, _job(log, "other")))
+        await _settle()
+        # The other device is not held up by the busy one
+        assert log == ["other"]
+        assert queue.running_count == 1
+
+        gate.set()
+        await asyncio.gather(first, second, other)
+        return log
+
+    assert asyncio.run(scenario()) == ["other", "first", "second"]
+
+
+def test_cancel_spares_more_urgent_jobs():
+    async def scenario():
+        queue = JobQueue(max_background=1)
+        log = []
+        gate = asyncio.Event()
+        blocker = asyncio.ensure_future(queue.run("a", PRIORITY_SCHEDULED, _job(log, "a", gate)))
+        await _settle()
+        manual = asyncio.ensure_future(queue.run("b", PRIORITY_MANUAL, _job(log, "b")))
+        scheduled = asyncio.ensure_future(queue.run("c", PRIORITY_SCHEDULED, _job(log, "c")))
+        recovery = asyncio.ensure_future(queue.run("d", PRIORITY_RECOVERY, _job(log, "d")))
+        await _settle()
+
+        assert queue.cancel() == 2
+        gate.set()
+        await asyncio.gather(blocker, recovery)
+        with pytest.raises(JobCancelled):
+            await manual
+        with pytest.raises(JobCancelled):
+            await scheduled
+        await queue.async_shutdown()
+        return log
+
+    assert asyncio.run(scenario()) == ["a", "d"]
+
+
+def test_cancel_one_device():
+    async def scenario():
+        queue = JobQueue(max_background=1)
+        log = []
+        gate = asyncio.Event()
+        blocker = asyncio.ensure_future(queue.run("a", PRIORITY_SCHEDULED, _job(log, "a", gate)))
+        await _settle()
+        b = asyncio.ensure_future(queue.run("b", PRIORITY_SCHEDULED, _job(log, "b")))
+        c = asyncio.ensure_future(queue.run("c", PRIORITY_SCHEDULED, _job(log, "c")))
+        await _settle()
+
+        assert queue.cancel("b") == 1
+        gate.set()
+        await asyncio.gather(blocker, c)
+        with pytest.raises(JobCancelled):
+            await b
+        await queue.async_shutdown()
+        return log
+
+    assert asyncio.run(scenario()) == ["a", "c"]
+
+
+def test_shutdown_cancels_running_jobs():
+    async def scenario():
+        queue = JobQueue()
+        running = asyncio.ensure_future(
+            queue.run("a", PRIORITY_INTERACTIVE, _job([], "a", asyncio.Event()), "Restore of a")
+        )
+        await _settle()
+        await queue.async_shutdown()
+        with pytest.raises(JobCancelled, match="Restore of a cancelled"):
+            await running
+        assert queue.running_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_tasks_use_given_factory():
+    async def scenario():
+        names = []
+
+        def create_task(coro, name):
+            names.append(name)
+            return asyncio.create_task(coro)
+
+        queue = JobQueue(create_task=create_task)
+        await queue.run("a", PRIORITY_MANUAL, _job([], "a"), "Backup of a")
+        await queue.async_shutdown()
+        return names
+
+    assert asyncio.run(scenario()) == ["job queue loop lag monitor", "job Backup of a"]
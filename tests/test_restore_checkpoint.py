@@ -0,0 +1,68 @@
+"""Tests for the restore_all checkpoint."""
+from advanced_shelly.restore_checkpoint import (
+    ITEM_CONFIG,
+    STATUS_FAILED,
+    STATUS_RESTORED,
+    STATUS_UNCHANGED,
+    RestoreCheckpoint,
+    script_item,
+)
+
+
+def test_new_job_is_unfinished(tmp_path):
+    checkpoint = RestoreCheckpoint.create(tmp_path / "job.json", ["a", "b"], "HEAD~1", True)
+    assert not checkpoint.finished
+    assert checkpoint.device_ids == ["a", "b"]
+    assert checkpoint.revision == "HEAD~1"
+    assert checkpoint.include_config
+
+
+def test_job_without_devices_is_finished(tmp_path):
+    checkpoint = RestoreCheckpoint.create(tmp_path / "job.json", [], None, False)
+    assert checkpoint.finished
+
+
+def test_finished_once_every_device_is_complete(tmp_path):
+    checkpoint = RestoreCheckpoint.create(tmp_path / "job.json", ["a", "b"], None, False)
+    checkpoint.complete_device("a")
+    checkpoint.complete_device("a")
+    assert not checkpoint.finished
+    checkpoint.complete_device("b")
+    assert checkpoint.finished
+
+
+def test_resume_skips_done_items(tmp_path):
+    path = tmp_path / "job.json"
+    checkpoint = RestoreCheckpoint.create(path, ["a", "b"], None, True)
+    checkpoint.mark("a", ITEM_CONFIG, STATUS_UNCHANGED)
+    checkpoint.mark("a", script_item(1), STATUS_RESTORED)
+    checkpoint.mark("a", script_item(2), STATUS_FAILED)
+    checkpoint.complete_device("b")
+    checkpoint.save()
+
+    resumed = RestoreCheckpoint.load(path)
+    assert not resumed.finished
+    assert resumed.include_config
+    assert resumed.is_done("a", ITEM_CONFIG)
+    assert resumed.is_done("a", script_item(1))
+    # Failed items are tried again
+    assert not resumed.is_done("a", script_item(2))
+    assert not resumed.is_done("a", script_item(3))
+    assert not resumed.is_device_complete("a")
+    assert resumed.is_device_complete("b")
+    assert resumed.summary() == {"a": {"unchanged": 1, "restored": 1, "failed": 1}, "b": {}}
+
+
+def test_save_replaces_file(tmp_path):
+    path = tmp_path / "nested" / "job.json"
+    checkpoint = RestoreCheckpoint.create(path, ["a"], None, False)
+    checkpoint.save()
+    checkpoint.complete_device("a")
+    checkpoint.save()
+
+    assert RestoreCheckpoint.load(path).finished
+    assert not path.with_suffix(".tmp").exists()
+
+
+def test_load_missing_file(tmp_path):
+    assert RestoreCheckpoint.load(tmp_path / "job.json") is None
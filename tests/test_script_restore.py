@@ -0,0 +1,49 @@
+"""Tests for restoring script backups, shared by the integration and the CLI."""
+import asyncio
+import json
+
+from advanced_shelly.backup import list_live_scripts, read_script_metadata, restore_script
+
+
+def _restore(client, script_id, code, metadata=None):
+    async def scenario():
+        live_scripts = await list_live_scripts(client)
+        return await restore_script(client, script_id, code, metadata or {}, live_scripts, "dev")
+    return asyncio.run(scenario())
+
+
+def test_unchanged_script_is_skipped(fake_client):
+    client = fake_client([{"id": 1, "name": "heating", "enable": True, "code": "a()"}])
+    assert not _restore(client, 1, "a()")
+    assert "Script.PutCode" not in client.calls
+
+
+def test_changed_script_is_uploaded(fake_client):
+    client = fake_client([{"id": 1, "name": "heating", "enable": True, "code": "old()"}])
+    assert _restore(client, 1, "new()")
+    assert client.scripts[1]["code"] == "new()"
+
+
+def test_missing_script_is_created(fake_client):
+    # A factory reset left the device without scripts
+    client = fake_client([])
+    assert _restore(client, 4, "a()", {"name": "heating", "enable": True})
+    assert client.scripts == {1: {"id": 1, "name": "heating", "enable": True, "code": "a()"}}
+
+
+def test_missing_script_reuses_same_name(fake_client):
+    client = fake_client([{"id": 2, "name": "heating", "enable": False, "code": "old()"}])
+    assert _restore(client, 4, "a()", {"name": "heating", "enable": True})
+    assert "Script.Create" not in client.calls
+    assert client.scripts[2]["code"] == "a()"
+
+
+def test_read_script_metadata(tmp_path):
+    code_file = tmp_path / "1_heating.js"
+    code_file.write_text("a()", encoding="utf-8")
+    assert read_script_metadata(code_file) == {}
+
+    code_file.with_suffix(".json").write_text(
+        json.dumps({"id": 1, "name": "heating", "enable": True}), encoding="utf-8"
+    )
+    assert read_script_metadata(code_file)["name"] == "heating"
@@ -0,0 +1,64 @@
+"""Tests for hash-based script deploys."""
+import asyncio
+
+from advanced_shelly.backup import code_hash
+from advanced_shelly.script_sync import load_script_sources, sync_scripts
+
+
+def _sync(client, sources, **kwargs):
+    return asyncio.run(sync_scripts(client, sources, **kwargs))
+
+
+def test_unchanged_deploy_costs_one_call(fake_client):
+    client = fake_client([{"id": 1, "name": "heating", "enable": True, "code": "a()"}])
+    report = _sync(client, {"heating": "a()"}, stored_hashes={1: code_hash("a()")})
+    assert report["unchanged"] == ["heating"]
+    assert client.calls == ["Script.List"]
+
+
+def test_without_stored_hash_live_code_is_compared(fake_client):
+    client = fake_client([{"id": 1, "name": "heating", "enable": True, "code": "a()"}])
+    report = _sync(client, {"heating": "a()"})
+    assert report["unchanged"] == ["heating"]
+    assert client.calls == ["Script.List", "Script.GetCode"]
+
+
+def test_verify_ignores_stale_stored_hash(fake_client):
+    client = fake_client([{"id": 1, "name": "heating", "enable": True, "code": "edited()"}])
+    report = _sync(client, {"heating": "a()"}, stored_hashes={1: code_hash("a()")}, verify=True)
+    assert report["updated"] == ["heating"]
+    assert client.scripts[1]["code"] == "a()"
+
+
+def test_creates_updates_and_enables(fake_client):
+    client = fake_client([
+        {"id": 1, "name": "heating", "enable": True, "code": "old()"},
+        {"id": 2, "name": "lights", "enable": False, "code": "b()"},
+    ])
+    report = _sync(client, {"heating": "new()", "lights": "b()", "pump": "c()"})
+
+    assert report["updated"] == ["heating"]
+    assert report["enabled"] == ["lights"]
+    assert report["created"] == ["pump"]
+    assert client.scripts[3] == {"id": 3, "name": "pump", "enable": True, "code": "c()"}
+    assert client.scripts[2]["enable"]
+
+
+def test_delete_only_when_asked(fake_client):
+    scripts = [
+        {"id": 1, "name": "heating", "enable": True, "code": "a()"},
+        {"id": 2, "name": "old", "enable": True, "code": "x()"},
+    ]
+    client = fake_client(scripts)
+    assert _sync(client, {"heating": "a()"})["deleted"] == []
+    assert 2 in client.scripts
+
+    report = _sync(client, {"heating": "a()"}, delete=True)
+    assert report["deleted"] == ["old"]
+    assert list(client.scripts) == [1]
+
+
+def test_load_script_sources(tmp_path):
+    (tmp_path / "heating.js").write_text("a()", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not a script", encoding="utf-8")
+    assert load_script_sources(tmp_path) == {"heating": "a()"}
@@ -0,0 +1,57 @@
+"""Tests for the timeouts of the Shelly RPC client."""
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from advanced_shelly import shelly_client
+from advanced_shelly.shelly_client import ShellyClient, get_latency_tracker
+
+
+def _run_hanging_device(port, timeout, samples=0):
+    """Call Shelly.GetStatus on a device that never answers; return the request count and time."""
+    async def scenario():
+        requests = []
+        release = asyncio.Event()
+
+        async def hang(request):
+            requests.append(request.path)
+            await release.wait()
+            return web.json_response({})
+
+        app = web.Application()
+        app.router.add_get("/rpc/Shelly.GetStatus", hang)
+        runner = web.AppRunner(app, shutdown_timeout=0)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+
+        tracker = get_latency_tracker("127.0.0.1", port)
+        for _ in range(samples):
+            tracker.record("/rpc/Shelly.GetStatus", 0.01)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            async with ShellyClient("127.0.0.1", port, None, request_interval=0, timeout=timeout) as client:
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.get_status()
+            return len(requests), loop.time() - started
+        finally:
+            release.set()
+            await runner.cleanup()
+
+    return asyncio.run(scenario())
+
+
+def test_default_timeout_is_not_retried():
+    count, elapsed = _run_hanging_device(18761, timeout=0.3)
+    assert count == 1
+    assert elapsed < 0.6
+
+
+def test_shortened_timeout_is_retried_up_to_client_timeout(monkeypatch):
+    monkeypatch.setattr(shelly_client, "MIN_RPC_TIMEOUT", 0.1)
+    count, elapsed = _run_hanging_device(18762, timeout=0.15, samples=10)
+    # 0.1 s adaptive, then capped at the 0.15 s client timeout
+    assert count == 2
+    assert elapsed == pytest.approx(0.25, abs=0.15)